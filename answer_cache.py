@@ -0,0 +1,131 @@
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+
+def context_fingerprint(context_docs: List[Dict[str, Any]], news_context: List[Dict[str, Any]],
+                        extra: Any = None) -> str:
+    """
+    Hash of the retrieved context plus `extra` (whatever else shapes the prompt, such as
+    the query type and conversation history). Stored documents are identified by ID and
+    content hash, so editing, adding or removing a retrieved document changes the key.
+    """
+    documents = [(doc["id"], doc.get("metadata", {}).get("content_hash") or doc.get("document", ""))
+                 for doc in context_docs]
+    news = [(article.get("url", ""), article.get("title", ""), article.get("published_at", ""))
+            for article in news_context]
+    payload = json.dumps({"documents": documents, "news": news, "extra": extra}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class SemanticAnswerCache:
+    """
+    On-disk SQLite cache of LLM answers. A lookup hits when an unexpired entry has the
+    same context fingerprint and a query embedding within the similarity threshold.
+    """
+
+    def __init__(self, path: str, similarity_threshold: float = 0.95, ttl_seconds: float = 6 * 3600,
+                 max_entries: int = 5000, namespace: str = "default"):
+        self.path = path
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " fingerprint TEXT NOT NULL,"
+            " query TEXT NOT NULL,"
+            " embedding BLOB NOT NULL,"
+            " answer TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_fingerprint ON answers(fingerprint)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_last_used ON answers(last_used)")
+        self._conn.commit()
+
+    def _key(self, fingerprint: str) -> str:
+        # The namespace keeps answers from different embedders and LLMs apart
+        return hashlib.sha1(f"{self.namespace}\0{fingerprint}".encode("utf-8")).hexdigest()
+
+    def get(self, query_embedding: List[float], fingerprint: str) -> Optional[str]:
+        """Cached answer for a similar query over the same context, or None"""
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        query_vector = query_vector / max(float(np.linalg.norm(query_vector)), 1e-12)
+        now = time.time()
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, embedding, answer FROM answers WHERE fingerprint = ? AND created >= ?",
+                (self._key(fingerprint), now - self.ttl_seconds)
+            ).fetchall()
+
+            best = None
+            for row_id, blob, answer in rows:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                similarity = float(vector @ query_vector / max(float(np.linalg.norm(vector)), 1e-12))
+                if similarity >= self.similarity_threshold and (best is None or similarity > best[0]):
+                    best = (similarity, row_id, answer)
+
+            if best is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE answers SET last_used = ? WHERE id = ?", (now, best[1]))
+            self._conn.commit()
+            self.hits += 1
+            return best[2]
+
+    def put(self, query: str, query_embedding: List[float], fingerprint: str, answer: str):
+        """Store an answer, dropping expired entries and evicting least recently used ones"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO answers (fingerprint, query, embedding, answer, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self._key(fingerprint), query, np.asarray(query_embedding, dtype=np.float32).tobytes(),
+                 answer, now, now)
+            )
+            self._conn.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl_seconds,))
+
+            overflow = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM answers WHERE id IN "
+                    "(SELECT id FROM answers ORDER BY last_used LIMIT ?)", (overflow,)
+                )
+                self.evictions += overflow
+
+            self._conn.commit()
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions
+        }
@@ -74,6 +74,20 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def render_stream(stream, spinner_text: str) -> str:
+    """Render an answer chunk by chunk as it streams in, returning the full text"""
+    placeholder = st.empty()
+    # Retrieval runs before the first chunk arrives
+    with st.spinner(spinner_text):
+        response = next(stream, "")
+    # Each chunk is drawn as soon as it arrives, with a cursor until the stream ends
+    placeholder.markdown(f'<div class="assistant-message">{response}▌</div>', unsafe_allow_html=True)
+    for chunk in stream:
+        response += chunk
+        placeholder.markdown(f'<div class="assistant-message">{response}▌</div>', unsafe_allow_html=True)
+    placeholder.markdown(f'<div class="assistant-message">{response}</div>', unsafe_allow_html=True)
+    return response
+
 # Initialize session state
 if 'rag_pipeline' not in st.session_state:
     st.session_state.rag_pipeline = None
@@ -243,17 +257,19 @@ else:
             # Add user message to history
             st.session_state.chat_history.append({"role": "user", "content": prompt})
 
-            # Process query
-            with st.spinner("Analyzing your question..."):
-                try:
-                    response = st.session_state.rag_pipeline.process_query(prompt)
-                    st.session_state.chat_history.append({"role": "assistant", "content": response})
+            st.markdown(f'<div class="user-message">{prompt}</div>', unsafe_allow_html=True)
 
-                    # Rerun to update chat display
-                    st.rerun()
+            # Process query, showing the answer as it is generated
+            try:
+                response = render_stream(st.session_state.rag_pipeline.process_query_stream(prompt),
+                                         "Analyzing your question...")
+                st.session_state.chat_history.append({"role": "assistant", "content": response})
 
-                except Exception as e:
-                    st.error(f"Error processing query: {str(e)}")
+                # Rerun to update chat display
+                st.rerun()
+
+            except Exception as e:
+                st.error(f"Error processing query: {str(e)}")
 
         # Quick action buttons
         st.subheader("🚀 Quick Actions")
@@ -261,27 +277,27 @@ else:
 
         with col1:
             if st.button("📊 Manufacturing Overview"):
-                with st.spinner("Getting manufacturing sector overview..."):
-                    response = st.session_state.rag_pipeline.get_sector_summary("Manufacturing")
-                    st.session_state.chat_history.append({"role": "user", "content": "Manufacturing sector overview"})
-                    st.session_state.chat_history.append({"role": "assistant", "content": response})
-                    st.rerun()
+                response = render_stream(st.session_state.rag_pipeline.get_sector_summary_stream("Manufacturing"),
+                                         "Getting manufacturing sector overview...")
+                st.session_state.chat_history.append({"role": "user", "content": "Manufacturing sector overview"})
+                st.session_state.chat_history.append({"role": "assistant", "content": response})
+                st.rerun()
 
         with col2:
             if st.button("💡 Technology Trends"):
-                with st.spinner("Analyzing technology sector trends..."):
-                    response = st.session_state.rag_pipeline.get_sector_summary("Technology")
-                    st.session_state.chat_history.append({"role": "user", "content": "Technology sector trends"})
-                    st.session_state.chat_history.append({"role": "assistant", "content": response})
-                    st.rerun()
+                response = render_stream(st.session_state.rag_pipeline.get_sector_summary_stream("Technology"),
+                                         "Analyzing technology sector trends...")
+                st.session_state.chat_history.append({"role": "user", "content": "Technology sector trends"})
+                st.session_state.chat_history.append({"role": "assistant", "content": response})
+                st.rerun()
 
         with col3:
             if st.button("🏥 Healthcare Analysis"):
-                with st.spinner("Getting healthcare sector analysis..."):
-                    response = st.session_state.rag_pipeline.get_sector_summary("Healthcare")
-                    st.session_state.chat_history.append({"role": "user", "content": "Healthcare sector analysis"})
-                    st.session_state.chat_history.append({"role": "assistant", "content": response})
-                    st.rerun()
+                response = render_stream(st.session_state.rag_pipeline.get_sector_summary_stream("Healthcare"),
+                                         "Getting healthcare sector analysis...")
+                st.session_state.chat_history.append({"role": "user", "content": "Healthcare sector analysis"})
+                st.session_state.chat_history.append({"role": "assistant", "content": response})
+                st.rerun()
 
         # Clear chat button
         if st.button("🗑️ Clear Chat History"):
@@ -0,0 +1,276 @@
+"""
+Offline benchmarks for the vector store backends.
+
+    python benchmark.py backends --documents 20000 --queries 200
+    python benchmark.py client-modes --workers 4
+
+Uses the deterministic hashing embedder, so no model download or API key is needed.
+"""
+import os
+import sys
+import time
+import json
+import shutil
+import socket
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+from queue import Empty
+from typing import List, Dict, Any
+import numpy as np
+import pandas as pd
+
+import config
+from embeddings import HashingEmbedder
+
+
+def current_rss_mb(pid: str = "self") -> float:
+    """Resident set size of this (or another) process in MB"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    # Peak rather than current RSS where /proc is unavailable (ru_maxrss is KB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def build_corpus(documents: int) -> List[str]:
+    """Synthetic company-style documents derived from the bundled CSV"""
+    companies_df = pd.read_csv("cleaned_companies.csv")
+    rng = np.random.default_rng(42)
+    rows = companies_df.sample(n=documents, replace=True, random_state=42).reset_index(drop=True)
+    words = " ".join(companies_df["Primary_Products"].astype(str)).split()
+    return [
+        f"Company: {row.Company_Name} {i} | Sector: {row.Sector} | Location: {row.Location} | "
+        f"Products: {' '.join(rng.choice(words, size=8))} | Employees: {rng.integers(10, 500)}"
+        for i, row in enumerate(rows.itertuples())
+    ]
+
+
+def open_backend(name: str, workdir: str):
+    if name == "chroma":
+        import chromadb
+        return chromadb.PersistentClient(path=os.path.join(workdir, "chroma"))
+    if name == "chroma-http":
+        import chromadb
+        return chromadb.HttpClient(host=config.CHROMA_HOST, port=str(config.CHROMA_PORT))
+    from flat_store import FlatVectorClient
+    return FlatVectorClient(os.path.join(workdir, name), quantization=name.split("-")[1])
+
+
+def _build_worker(name: str, workdir: str, queue):
+    embeddings = np.load(os.path.join(workdir, "embeddings.npy"))
+    with open(os.path.join(workdir, "corpus.json")) as f:
+        corpus = json.load(f)
+
+    start = time.perf_counter()
+    client = open_backend(name, workdir)
+    collection = client.get_or_create_collection("benchmark", metadata={"hnsw:space": "cosine"})
+    batch_size = min(config.INGEST_BATCH_SIZE, getattr(client, "max_batch_size", config.INGEST_BATCH_SIZE))
+    for offset in range(0, len(corpus), batch_size):
+        end = offset + batch_size
+        collection.add(
+            ids=[f"doc_{i}" for i in range(offset, min(end, len(corpus)))],
+            documents=corpus[offset:end],
+            metadatas=[{"shard": i % 4} for i in range(offset, min(end, len(corpus)))],
+            embeddings=embeddings[offset:end].tolist()
+        )
+    queue.put({"build_seconds": time.perf_counter() - start})
+
+
+def _query_worker(name: str, workdir: str, k: int, queue):
+    queries = np.load(os.path.join(workdir, "queries.npy"))
+    baseline_rss = current_rss_mb()
+
+    start = time.perf_counter()
+    client = open_backend(name, workdir)
+    collection = client.get_or_create_collection("benchmark", metadata={"hnsw:space": "cosine"})
+    collection.query(query_embeddings=queries[:1].tolist(), n_results=k)  # Warm-up also loads the index
+    open_seconds = time.perf_counter() - start
+
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([int(doc_id.split("_")[1]) for doc_id in result["ids"][0]])
+
+    queue.put({
+        "open_seconds": open_seconds,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "rss_mb": current_rss_mb() - baseline_rss,
+        "results": results
+    })
+
+
+def _run_isolated(target, *args) -> Dict[str, Any]:
+    return _run_concurrent(1, target, *args)[0]
+
+
+def _run_concurrent(workers: int, target, *args) -> List[Dict[str, Any]]:
+    # Each phase runs in fresh processes so RSS reflects only that backend
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    processes = [context.Process(target=target, args=(*args, queue)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    results = []
+    while len(results) < workers:
+        try:
+            results.append(queue.get(timeout=1))
+        except Empty:
+            # A crashed worker never reports back; fail instead of waiting forever
+            if any(process.exitcode not in (None, 0) for process in processes):
+                for process in processes:
+                    process.kill()
+                raise RuntimeError(f"{target.__name__} failed in a worker process")
+    for process in processes:
+        process.join()
+    return results
+
+
+def _prepare_workload(workdir: str, documents: int, queries: int) -> tuple:
+    """Embed a synthetic corpus and query set into the work directory for the worker processes"""
+    print(f"Embedding {documents} documents and {queries} queries with the hashing embedder...")
+    corpus = build_corpus(documents)
+    embedder = HashingEmbedder(dimensions=config.HASHING_EMBEDDING_DIM, batch_size=config.EMBEDDING_BATCH_SIZE)
+    embeddings = embedder.encode(corpus)
+    rng = np.random.default_rng(7)
+    query_texts = [corpus[i].split("|")[0] + corpus[i].split("|")[3] for i in rng.choice(documents, queries)]
+    query_vectors = embedder.encode(query_texts)
+
+    np.save(os.path.join(workdir, "embeddings.npy"), embeddings)
+    np.save(os.path.join(workdir, "queries.npy"), query_vectors)
+    with open(os.path.join(workdir, "corpus.json"), "w") as f:
+        json.dump(corpus, f)
+    return embeddings, query_vectors
+
+
+def bench_backends(documents: int, queries: int, k: int, backends: List[str]):
+    """Compare latency, recall@k and RSS of the Chroma HNSW and flat backends"""
+    workdir = tempfile.mkdtemp(prefix="msme_bench_")
+    try:
+        embeddings, query_vectors = _prepare_workload(workdir, documents, queries)
+
+        # Exact float32 ground truth
+        truth = np.argsort(-(query_vectors @ embeddings.T), axis=1)[:, :k]
+
+        rows = []
+        for name in backends:
+            print(f"Benchmarking {name}...")
+            build = _run_isolated(_build_worker, name, workdir)
+            measured = _run_isolated(_query_worker, name, workdir, k)
+            recall = np.mean([len(set(found) & set(expected)) / k
+                              for found, expected in zip(measured.pop("results"), truth.tolist())])
+            rows.append({"backend": name, **build, **measured, f"recall@{k}": recall})
+
+        print()
+        print(pd.DataFrame(rows).set_index("backend").round(3).to_string())
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _start_chroma_server(path: str) -> subprocess.Popen:
+    """Run `chroma run` on a free local port and wait until it accepts writes"""
+    import chromadb
+    with socket.socket() as probe:
+        probe.bind(("localhost", 0))
+        port = probe.getsockname()[1]
+    # Spawned workers import config afresh, so the environment carries the server address
+    os.environ["CHROMA_HOST"], os.environ["CHROMA_PORT"] = "localhost", str(port)
+    config.CHROMA_HOST, config.CHROMA_PORT = "localhost", port
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "chromadb.cli.cli", "run", "--path", path, "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 60
+    while True:
+        try:
+            client = chromadb.HttpClient(host="localhost", port=str(port))
+            client.heartbeat()
+            break
+        except Exception:
+            if server.poll() is not None or time.time() > deadline:
+                server.kill()
+                raise RuntimeError("Chroma server did not start")
+            time.sleep(0.5)
+
+    # The 0.4.18 server answers heartbeats under pydantic 2 but rejects every write with 422
+    try:
+        client.delete_collection(client.create_collection("server_probe").name)
+    except Exception as e:
+        server.kill()
+        raise RuntimeError(f"Chroma server is not usable ({str(e)}); it needs the fastapi "
+                           f"and pydantic versions pinned in requirements.txt")
+    return server
+
+
+def bench_client_modes(documents: int, queries: int, k: int, workers: int):
+    """Per-worker memory and query latency of embedded clients vs clients of one shared server"""
+    workdir = tempfile.mkdtemp(prefix="msme_bench_")
+    server = None
+    try:
+        _prepare_workload(workdir, documents, queries)
+        server = _start_chroma_server(os.path.join(workdir, "server"))
+
+        rows = []
+        for name in ["chroma", "chroma-http"]:
+            print(f"Benchmarking {name} with {workers} concurrent workers...")
+            build = _run_isolated(_build_worker, name, workdir)
+            server_rss = current_rss_mb(server.pid)
+            measured = _run_concurrent(workers, _query_worker, name, workdir, k)
+            rows.append({
+                "mode": "embedded" if name == "chroma" else "http",
+                "workers": workers,
+                **build,
+                "open_seconds": np.mean([m["open_seconds"] for m in measured]),
+                "p50_ms": np.mean([m["p50_ms"] for m in measured]),
+                "p95_ms": np.max([m["p95_ms"] for m in measured]),
+                "rss_mb_per_worker": np.mean([m["rss_mb"] for m in measured]),
+                # The server holds the index once, however many workers query it
+                "server_rss_mb": current_rss_mb(server.pid) if name == "chroma-http" else 0.0,
+                "server_rss_growth_mb": current_rss_mb(server.pid) - server_rss if name == "chroma-http" else 0.0
+            })
+
+        print()
+        print(pd.DataFrame(rows).set_index("mode").round(3).to_string())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MSME vector store benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backends = subparsers.add_parser("backends", help="Chroma HNSW vs flat memory-mapped backend")
+    backends.add_argument("--documents", type=int, default=20000)
+    backends.add_argument("--queries", type=int, default=200)
+    backends.add_argument("--k", type=int, default=10)
+    backends.add_argument("--backends", nargs="+", default=["chroma", "flat-float16", "flat-int8"])
+
+    modes = subparsers.add_parser("client-modes", help="Embedded Chroma clients vs one shared HTTP server")
+    modes.add_argument("--documents", type=int, default=20000)
+    modes.add_argument("--queries", type=int, default=200)
+    modes.add_argument("--k", type=int, default=10)
+    modes.add_argument("--workers", type=int, default=4)
+
+    args = parser.parse_args()
+    if args.command == "backends":
+        bench_backends(args.documents, args.queries, args.k, args.backends)
+    elif args.command == "client-modes":
+        bench_client_modes(args.documents, args.queries, args.k, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -63,9 +63,118 @@ SECTOR_KEYWORDS = {
     "Textiles": ["textile", "garment", "fabric", "apparel", "fashion", "clothing", "cotton", "fiber"]
 }
 
+# Vector backend: "chroma" (HNSW) or "flat" (exact scan over a memory-mapped matrix)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+FLAT_INDEX_DIRECTORY = "./flat_index"
+FLAT_QUANTIZATION = "float16"  # "float16" or "int8"
+
 # ChromaDB Settings
 CHROMA_PERSIST_DIRECTORY = "./chroma_db"
+# "embedded" opens CHROMA_PERSIST_DIRECTORY in-process; "http" connects to a Chroma server
+# (`chroma run --path ./chroma_db`) so several app workers share one index
+CHROMA_CLIENT_MODE = os.getenv("CHROMA_CLIENT_MODE", "embedded")
+CHROMA_HOST = os.getenv("CHROMA_HOST", "localhost")
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
 COLLECTION_NAME = "msme_knowledge_base"
+# Partitioned layout: one company collection (optionally per sector) plus time-partitioned news
+PARTITIONED_LAYOUT = False
+COMPANY_COLLECTION_NAME = "msme_companies"
+PARTITION_COMPANIES_BY_SECTOR = False
+NEWS_COLLECTION_PREFIX = "msme_news_"
+NEWS_PARTITION_FORMAT = "%Y_%m"  # One news collection per month
+OTHER_COLLECTION_NAME = "msme_other"
+
+# Not used in "http" mode, where stats are recounted from the server's documents on each call
+STATS_INDEX_PATH = os.path.join(
+    FLAT_INDEX_DIRECTORY if VECTOR_BACKEND == "flat" else CHROMA_PERSIST_DIRECTORY, "stats_index.json"
+)
+INGEST_BATCH_SIZE = 1000  # Documents per collection.add call during bulk loads
+
+# Pre-built knowledge base snapshot imported on cold start (see MSMEVectorStore.export_snapshot)
+SNAPSHOT_PATH = "./knowledge_base_snapshot.npz"
+
+# Near-duplicate news: MinHash over character shingles of title + description, banded LSH lookups
+NEAR_DUPLICATE_THRESHOLD = 0.7  # Estimated Jaccard similarity treated as the same story (None disables)
+NEAR_DUPLICATE_SHINGLE_SIZE = 5
+NEAR_DUPLICATE_NUM_PERM = 128
+NEAR_DUPLICATE_BANDS = 32  # 32 bands x 4 rows: candidates from ~0.4 similarity, verified against the threshold
+NEAR_DUPLICATE_WINDOW_DAYS = 7  # http mode: stored news compared against, read from the server per batch
+
+# Provider quotas (README); None means no limit on that window
+NEWS_RATE_LIMITS = {
+    "newsdata": {"per_minute": None, "per_day": 200},
+    "finnhub": {"per_minute": 60, "per_day": None},
+    "alpha_vantage": {"per_minute": 5, "per_day": None},
+    "marketaux": {"per_minute": None, "per_day": 100}
+}
+NEWS_RATE_LIMIT_STATE_PATH = "./news_rate_limits.json"
+NEWS_RATE_LIMIT_MAX_WAIT_SECONDS = 5  # Longest wait for a per-minute token before skipping the call
+
+# Pooled keep-alive HTTP sessions for the news providers
+NEWS_HTTP_POOL_SIZE = 4  # Connections kept per provider
+NEWS_HTTP_MAX_RETRIES = 2  # Extra attempts on 429/5xx and connection errors
+NEWS_HTTP_BACKOFF_SECONDS = 0.5  # Base delay, doubled per attempt and jittered
+NEWS_HTTP_MAX_BACKOFF_SECONDS = 8
+
+# On-disk cache of provider responses (see response_cache.py); stale entries are revalidated
+# with If-None-Match/If-Modified-Since where the provider sent an ETag or Last-Modified
+NEWS_RESPONSE_CACHE_ENABLED = True
+NEWS_RESPONSE_CACHE_PATH = "./news_response_cache.sqlite3"
+NEWS_CACHE_TTL_SECONDS = {
+    "newsdata": 15 * 60,
+    "finnhub": 5 * 60,
+    "alpha_vantage": 30 * 60,
+    "marketaux": 15 * 60
+}
+NEWS_RESPONSE_CACHE_RETENTION_SECONDS = 24 * 3600  # Stale entries kept this long for revalidation
+NEWS_API_SECRET_PARAMS = ["apikey", "token", "api_token"]  # Left out of cache keys
+
+# News providers are queried in parallel; whatever has not arrived by the deadline is dropped
+NEWS_FETCH_CONCURRENT = True
+NEWS_FETCH_DEADLINE_SECONDS = 12
+NEWS_FETCH_WORKERS = 16  # One pool for every aggregator; sessions fetching at once share it
+
+# News retention, enforced by MSMEVectorStore.compact_news (None disables a limit)
+NEWS_MAX_AGE_DAYS = 30
+NEWS_MAX_PER_SOURCE = 500
+NEWS_COMPACT_ON_STARTUP = False  # Otherwise run compact_news as a scheduled maintenance job
+NEWS_COMPACT_RECLAIM_MIN_DELETED = 100  # Deleted vectors before compaction rewrites the database file
+
+# Embedding backend: "sentence_transformers", "chroma_default" or "hashing" (offline, deterministic)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence_transformers")
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_BATCH_SIZE = 256
+EMBEDDING_WORKERS = os.cpu_count() or 1
+EMBEDDING_POOL = "thread"  # "thread" or "process"
+HASHING_EMBEDDING_DIM = 384
+
+# Embedding cache (content hash -> vector), shared by ingestion and queries
+EMBEDDING_CACHE_PATH = "./embedding_cache.sqlite3"
+EMBEDDING_CACHE_MAX_ENTRIES = 200000
+
+# Concurrent filter groups in MSMEVectorStore.search_batch
+SEARCH_BATCH_WORKERS = 8
+
+# Worker threads for the blocking I/O of MSMERAGPipeline.process_query_async
+ASYNC_IO_WORKERS = 32
+
+# Retrieved context is reduced by maximal marginal relevance before it reaches the LLM
+MMR_CONTEXT_DOCS = 8  # Documents kept for the prompt
+MMR_LAMBDA = 0.7  # 1.0 ranks purely by relevance, 0.0 purely by diversity
+
+# Semantic answer cache in front of the LLM call (see answer_cache.py)
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_PATH = "./answer_cache.sqlite3"
+ANSWER_CACHE_SIMILARITY = 0.95  # Minimum cosine similarity between query embeddings
+ANSWER_CACHE_TTL_SECONDS = 6 * 3600
+ANSWER_CACHE_MAX_ENTRIES = 5000
+
+# Hybrid retrieval: BM25 and vector rankings merged with reciprocal-rank fusion
+HYBRID_SEARCH = True
+HYBRID_CANDIDATES = 30  # Hits taken from each ranking before fusion
+HYBRID_RRF_K = 60
+BM25_K1 = 1.5
+BM25_B = 0.75
 
 # Streamlit Configuration
 PAGE_CONFIG = {
@@ -0,0 +1,289 @@
+import re
+import sqlite3
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+import numpy as np
+import config
+
+class EmbeddingCache:
+    """
+    On-disk SQLite cache of embedding vectors keyed by content hash
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, namespace: str = "default"):
+        self.path = path
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _key(self, text: str) -> str:
+        # The namespace keeps vectors from different embedding models apart
+        return hashlib.sha1(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up cached vectors, returning None for every miss"""
+        keys = [self._key(text) for text in texts]
+        found = {}
+
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for offset in range(0, len(keys), 500):
+                chunk = keys[offset:offset + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update({key: np.frombuffer(blob, dtype=np.float32) for key, blob in rows})
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        return [found.get(key) for key in keys]
+
+    def put_many(self, texts: List[str], vectors: List[Any]):
+        """Store vectors for texts, evicting least recently used entries past the size bound"""
+        if not texts:
+            return
+
+        now = time.time()
+        rows = [(self._key(text), np.asarray(vector, dtype=np.float32).tobytes(), now)
+                for text, vector in zip(texts, vectors)]
+
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+            )
+            self._size += self._conn.total_changes - before
+
+            overflow = self._size - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (overflow,)
+                )
+                self._size -= overflow
+                self.evictions += overflow
+
+            self._conn.commit()
+
+    def clear(self):
+        """Drop every cached vector"""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+
+class CachedEmbeddingFunction:
+    """
+    Chroma embedding function that consults an EmbeddingCache before embedding
+    """
+
+    def __init__(self, embedding_function, cache: EmbeddingCache):
+        self.embedding_function = embedding_function
+        self.cache = cache
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        cached = self.cache.get_many(input)
+
+        # Embed each distinct missing text once
+        missing = list(dict.fromkeys(text for text, vector in zip(input, cached) if vector is None))
+        if missing:
+            vectors = self.embedding_function(missing)
+            self.cache.put_many(missing, vectors)
+            fresh = {text: np.asarray(vector, dtype=np.float32) for text, vector in zip(missing, vectors)}
+            cached = [fresh[text] if vector is None else vector for text, vector in zip(input, cached)]
+
+        # Chroma validates plain Python floats
+        return [vector.tolist() for vector in cached]
+
+
+class BatchedEmbedder:
+    """
+    Base class for embedders that encode large batches, optionally across a worker pool
+    """
+
+    name = "batched"
+
+    def __init__(self, batch_size: int = 256, workers: int = 1, pool: str = "thread"):
+        self.batch_size = batch_size
+        self.workers = max(1, workers or 1)
+        self.pool = pool
+        self._executor = None
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def _get_executor(self):
+        if self._executor is None:
+            executor_class = ProcessPoolExecutor if self.pool == "process" else ThreadPoolExecutor
+            self._executor = executor_class(max_workers=self.workers)
+        return self._executor
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into a float32 matrix, one row per text"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if self.workers > 1 and len(batches) > 1:
+            encoded = list(self._get_executor().map(self._encode_batch, batches))
+        else:
+            encoded = [self._encode_batch(batch) for batch in batches]
+
+        return np.vstack(encoded).astype(np.float32, copy=False)
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return self.encode(list(input)).tolist()
+
+    def __getstate__(self):
+        # Executors cannot be pickled into worker processes
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+
+class HashingEmbedder(BatchedEmbedder):
+    """
+    Deterministic feature-hashing embedder; needs no model download, meant for offline benchmarks
+    """
+
+    def __init__(self, dimensions: int = 384, **kwargs):
+        super().__init__(**kwargs)
+        self.dimensions = dimensions
+        self.name = f"hashing:{dimensions}"
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            tokens = re.findall(r"\w+", text.lower())
+            # Unigrams plus bigrams keep some word order
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                sign = 1.0 if digest & 1 else -1.0
+                matrix[row, (digest >> 1) % self.dimensions] += sign
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class SentenceTransformerEmbedder(BatchedEmbedder):
+    """
+    Local sentence-transformers model encoding in large batches
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", **kwargs):
+        super().__init__(**kwargs)
+        self.model_name = model_name
+        self.name = f"sentence_transformers:{model_name}"
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._process_pool = None
+
+    @property
+    def model(self):
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=self.batch_size,
+                                 convert_to_numpy=True, normalize_embeddings=True)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        # sentence-transformers manages its own multi-process pool, so the model is not pickled per batch
+        if self.pool == "process" and self.workers > 1 and len(texts) > self.batch_size:
+            if self._process_pool is None:
+                self._process_pool = self.model.start_multi_process_pool(["cpu"] * self.workers)
+            vectors = self.model.encode_multi_process(texts, self._process_pool, batch_size=self.batch_size)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            return (vectors / norms).astype(np.float32, copy=False)
+        return super().encode(texts)
+
+
+class ChromaDefaultEmbedder(BatchedEmbedder):
+    """
+    Chroma's bundled ONNX MiniLM model, fed in bounded batches
+    """
+
+    name = "chroma_default"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        from chromadb.utils import embedding_functions
+        self._embedding_function = embedding_functions.DefaultEmbeddingFunction()
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self._embedding_function(texts), dtype=np.float32)
+
+
+EMBEDDERS = {
+    "sentence_transformers": SentenceTransformerEmbedder,
+    "chroma_default": ChromaDefaultEmbedder,
+    "hashing": HashingEmbedder
+}
+
+
+def get_embedder(backend: str = None) -> BatchedEmbedder:
+    """Build the embedder selected in config.EMBEDDING_BACKEND"""
+    backend = backend or config.EMBEDDING_BACKEND
+    if backend not in EMBEDDERS:
+        raise ValueError(f"Unknown embedding backend '{backend}'. Choose from: {', '.join(EMBEDDERS)}")
+
+    kwargs = {
+        "batch_size": config.EMBEDDING_BATCH_SIZE,
+        "workers": config.EMBEDDING_WORKERS,
+        "pool": config.EMBEDDING_POOL
+    }
+    if backend == "sentence_transformers":
+        kwargs["model_name"] = config.EMBEDDING_MODEL
+    elif backend == "hashing":
+        kwargs["dimensions"] = config.HASHING_EMBEDDING_DIM
+
+    return EMBEDDERS[backend](**kwargs)
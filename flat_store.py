@@ -0,0 +1,438 @@
+import os
+import json
+import shutil
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+# Rows scored per block, so float16/int8 data is widened to float32 a slice at a time
+SCAN_BLOCK_ROWS = 65536
+
+
+class FlatVectorCollection:
+    """
+    Exact brute-force vector collection on a memory-mapped float16 (or int8) matrix.
+    Mirrors the subset of the chromadb Collection API used by MSMEVectorStore.
+    """
+
+    def __init__(self, directory: str, name: str, embedding_function=None, quantization: str = "float16"):
+        self.name = name
+        self.directory = directory
+        self.embedding_function = embedding_function
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(directory, "records.sqlite3"), check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " row INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, document TEXT, metadata TEXT)"
+        )
+        self._conn.commit()
+
+        settings = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        # The stored quantization wins, so an existing matrix is always read correctly
+        self.quantization = settings.get("quantization", quantization)
+        self.dimensions = int(settings["dimensions"]) if "dimensions" in settings else None
+        self._capacity = int(settings.get("capacity", 0))
+        self._vectors = None
+        self._scales = None
+
+        # Row-aligned in-memory state; documents stay in SQLite until requested
+        self._ids = []
+        self._metadatas = []
+        self._valid = np.zeros(0, dtype=bool)
+        self._rows = {}
+        self._free_rows = []
+        self._columns = {}
+
+        rows = self._conn.execute("SELECT row, id, metadata FROM records ORDER BY row").fetchall()
+        size = rows[-1][0] + 1 if rows else 0
+        self._ids = [None] * size
+        self._metadatas = [None] * size
+        self._valid = np.zeros(size, dtype=bool)
+        for row, doc_id, metadata in rows:
+            self._ids[row] = doc_id
+            self._metadatas[row] = json.loads(metadata) if metadata else {}
+            self._valid[row] = True
+            self._rows[doc_id] = row
+        self._free_rows = [row for row in range(size) if not self._valid[row]]
+
+        if self.dimensions and self._capacity:
+            self._open_matrix()
+
+    # ------------------------------------------------------------------ storage
+
+    @property
+    def _dtype(self):
+        return np.int8 if self.quantization == "int8" else np.float16
+
+    def _open_matrix(self):
+        vectors_path = os.path.join(self.directory, f"vectors.{self.quantization}")
+        self._vectors = np.memmap(vectors_path, dtype=self._dtype, mode="r+",
+                                  shape=(self._capacity, self.dimensions))
+        if self.quantization == "int8":
+            self._scales = np.memmap(os.path.join(self.directory, "scales.float32"), dtype=np.float32,
+                                     mode="r+", shape=(self._capacity,))
+
+    def _resize_file(self, path: str, size: int):
+        with open(path, "ab") as f:
+            f.truncate(size)
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._capacity:
+            return
+
+        capacity = max(1024, self._capacity)
+        while capacity < rows:
+            capacity *= 2
+
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._vectors = None
+        self._scales = None
+        self._resize_file(os.path.join(self.directory, f"vectors.{self.quantization}"),
+                          capacity * self.dimensions * np.dtype(self._dtype).itemsize)
+        if self.quantization == "int8":
+            self._resize_file(os.path.join(self.directory, "scales.float32"), capacity * 4)
+
+        self._capacity = capacity
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('capacity', ?)", (str(capacity),))
+        self._open_matrix()
+
+    def _store_vectors(self, rows: List[int], embeddings: np.ndarray):
+        # Normalized on write, so cosine similarity is a plain dot product
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embeddings = embeddings / norms
+
+        if self.quantization == "int8":
+            scales = np.abs(embeddings).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._vectors[rows] = np.round(embeddings / scales[:, None]).astype(np.int8)
+            self._scales[rows] = scales
+        else:
+            self._vectors[rows] = embeddings.astype(np.float16)
+
+    def _load_vectors(self, start: int, end: int) -> np.ndarray:
+        block = np.asarray(self._vectors[start:end], dtype=np.float32)
+        if self.quantization == "int8":
+            block *= np.asarray(self._scales[start:end])[:, None]
+        return block
+
+    # ------------------------------------------------------------------ filters
+
+    def _column(self, field: str) -> np.ndarray:
+        if field not in self._columns:
+            self._columns[field] = np.array(
+                [metadata.get(field) if metadata else None for metadata in self._metadatas], dtype=object
+            )
+        return self._columns[field]
+
+    def _numeric_column(self, field: str) -> np.ndarray:
+        key = f"#{field}"
+        if key not in self._columns:
+            self._columns[key] = np.array([
+                value if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+                for value in self._column(field)
+            ], dtype=np.float64)
+        return self._columns[key]
+
+    def _where_mask(self, where: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Evaluate a Chroma-style where clause into a row mask"""
+        mask = self._valid.copy()
+        if not where:
+            return mask
+
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._where_mask(clause)
+            elif key == "$or":
+                any_mask = np.zeros_like(mask)
+                for clause in condition:
+                    any_mask |= self._where_mask(clause)
+                mask &= any_mask
+            elif isinstance(condition, dict):
+                for operator, value in condition.items():
+                    mask &= self._compare(key, operator, value)
+            else:
+                mask &= self._compare(key, "$eq", condition)
+        return mask
+
+    def _compare(self, field: str, operator: str, value: Any) -> np.ndarray:
+        with np.errstate(invalid="ignore"):
+            if operator == "$eq":
+                return self._column(field) == value
+            if operator == "$ne":
+                return self._column(field) != value
+            if operator == "$in":
+                column = self._column(field)
+                return np.logical_or.reduce([column == item for item in value]) if value else np.zeros(len(column), bool)
+            if operator == "$nin":
+                column = self._column(field)
+                return ~np.logical_or.reduce([column == item for item in value]) if value else np.ones(len(column), bool)
+            numeric = self._numeric_column(field)
+            if operator == "$gt":
+                return numeric > value
+            if operator == "$gte":
+                return numeric >= value
+            if operator == "$lt":
+                return numeric < value
+            if operator == "$lte":
+                return numeric <= value
+        raise ValueError(f"Unsupported where operator: {operator}")
+
+    # ------------------------------------------------------------------ API
+
+    def count(self) -> int:
+        return len(self._rows)
+
+    def add(self, ids: List[str], documents: List[str] = None, metadatas: List[Dict] = None,
+            embeddings: List[List[float]] = None):
+        """Insert new records; like Chroma, IDs that already exist are ignored"""
+        keep = [i for i, doc_id in enumerate(ids) if doc_id not in self._rows]
+        if not keep:
+            return
+        self.upsert(
+            ids=[ids[i] for i in keep],
+            documents=[documents[i] for i in keep] if documents is not None else None,
+            metadatas=[metadatas[i] for i in keep] if metadatas is not None else None,
+            embeddings=[embeddings[i] for i in keep] if embeddings is not None else None
+        )
+
+    def upsert(self, ids: List[str], documents: List[str] = None, metadatas: List[Dict] = None,
+               embeddings: List[List[float]] = None):
+        if not ids:
+            return
+        if embeddings is None:
+            embeddings = self.embedding_function(documents)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        documents = documents if documents is not None else [None] * len(ids)
+        metadatas = metadatas if metadatas is not None else [{}] * len(ids)
+
+        with self._lock:
+            if self.dimensions is None:
+                self.dimensions = embeddings.shape[1]
+                self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                    ("dimensions", str(self.dimensions)), ("quantization", self.quantization)
+                ])
+
+            rows = []
+            for doc_id in ids:
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = self._free_rows.pop() if self._free_rows else len(self._ids)
+                    if row == len(self._ids):
+                        self._ids.append(None)
+                        self._metadatas.append(None)
+                    self._rows[doc_id] = row
+                rows.append(row)
+
+            if len(self._valid) < len(self._ids):
+                self._valid = np.concatenate([self._valid, np.zeros(len(self._ids) - len(self._valid), bool)])
+
+            self._ensure_capacity(len(self._ids))
+            self._store_vectors(rows, embeddings)
+
+            for row, doc_id, metadata in zip(rows, ids, metadatas):
+                self._ids[row] = doc_id
+                self._metadatas[row] = dict(metadata or {})
+                self._valid[row] = True
+            self._columns = {}
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO records (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                [(row, doc_id, document, json.dumps(metadata or {}))
+                 for row, doc_id, document, metadata in zip(rows, ids, documents, metadatas)]
+            )
+            self._conn.commit()
+            self._vectors.flush()
+
+    def delete(self, ids: List[str] = None, where: Dict[str, Any] = None):
+        with self._lock:
+            if ids is not None:
+                rows = [self._rows[doc_id] for doc_id in ids if doc_id in self._rows]
+                if where:
+                    mask = self._where_mask(where)
+                    rows = [row for row in rows if mask[row]]
+            else:
+                rows = np.flatnonzero(self._where_mask(where)).tolist()
+
+            for row in rows:
+                del self._rows[self._ids[row]]
+                self._ids[row] = None
+                self._metadatas[row] = None
+                self._valid[row] = False
+                self._free_rows.append(row)
+            self._columns = {}
+
+            self._conn.executemany("DELETE FROM records WHERE row = ?", [(row,) for row in rows])
+            self._conn.commit()
+
+    def compact(self):
+        """Pack live rows to the front, shrink the vector files and vacuum the record store"""
+        with self._lock:
+            live = np.flatnonzero(self._valid).tolist()
+            if self.dimensions is None or len(live) == len(self._ids) and self._capacity <= max(1024, len(live) * 2):
+                return
+
+            vectors = np.array(self._vectors[live]) if live else None
+            scales = np.array(self._scales[live]) if live and self.quantization == "int8" else None
+            records = self._conn.execute("SELECT row, id, document, metadata FROM records").fetchall()
+            new_rows = {old: new for new, old in enumerate(live)}
+
+            self._conn.execute("DELETE FROM records")
+            self._conn.executemany(
+                "INSERT INTO records (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                [(new_rows[row], doc_id, document, metadata) for row, doc_id, document, metadata in records]
+            )
+
+            # Rewrite the matrix at the smallest capacity that holds the live rows
+            self._vectors = None
+            self._scales = None
+            self._capacity = 0
+            for filename in (f"vectors.{self.quantization}", "scales.float32"):
+                path = os.path.join(self.directory, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+            self._ensure_capacity(max(1, len(live)))
+            if live:
+                self._vectors[:len(live)] = vectors
+                if scales is not None:
+                    self._scales[:len(live)] = scales
+                self._vectors.flush()
+
+            self._ids = [self._ids[row] for row in live]
+            self._metadatas = [self._metadatas[row] for row in live]
+            self._valid = np.ones(len(live), dtype=bool)
+            self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+            self._free_rows = []
+            self._columns = {}
+
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    def _documents(self, rows: List[int]) -> List[Optional[str]]:
+        documents = {}
+        for offset in range(0, len(rows), 500):
+            chunk = rows[offset:offset + 500]
+            placeholders = ",".join("?" * len(chunk))
+            documents.update(self._conn.execute(
+                f"SELECT row, document FROM records WHERE row IN ({placeholders})", chunk
+            ).fetchall())
+        return [documents.get(row) for row in rows]
+
+    def get(self, ids: List[str] = None, where: Dict[str, Any] = None, limit: int = None,
+            offset: int = None, include: List[str] = ("metadatas", "documents")) -> Dict[str, Any]:
+        with self._lock:
+            mask = self._where_mask(where)
+            if ids is not None:
+                rows = [self._rows[doc_id] for doc_id in ids if doc_id in self._rows and mask[self._rows[doc_id]]]
+            else:
+                rows = np.flatnonzero(mask).tolist()
+            rows = rows[offset or 0:]
+            if limit is not None:
+                rows = rows[:limit]
+
+            return {
+                "ids": [self._ids[row] for row in rows],
+                "embeddings": (self._load_rows(rows).tolist() if "embeddings" in include else None),
+                "metadatas": [self._metadatas[row] for row in rows] if "metadatas" in include else None,
+                "documents": self._documents(rows) if "documents" in include else None
+            }
+
+    def _load_rows(self, rows: List[int]) -> np.ndarray:
+        if not rows:
+            return np.zeros((0, self.dimensions or 0), dtype=np.float32)
+        block = np.asarray(self._vectors[rows], dtype=np.float32)
+        if self.quantization == "int8":
+            block *= np.asarray(self._scales[rows])[:, None]
+        return block
+
+    def query(self, query_embeddings: List[List[float]] = None, query_texts: List[str] = None,
+              n_results: int = 10, where: Dict[str, Any] = None,
+              include: List[str] = ("metadatas", "documents", "distances")) -> Dict[str, Any]:
+        """Exact top-k by cosine distance, scanning the matrix block by block"""
+        if query_embeddings is None:
+            query_embeddings = self.embedding_function(query_texts)
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        queries = queries / norms
+
+        with self._lock:
+            mask = self._where_mask(where)
+            candidates = np.flatnonzero(mask)
+            k = min(n_results, len(candidates))
+
+            all_rows, all_scores = [], []
+            if k and self.dimensions:
+                scores = np.full((len(queries), len(mask)), -np.inf, dtype=np.float32)
+                for start in range(0, len(mask), SCAN_BLOCK_ROWS):
+                    end = min(start + SCAN_BLOCK_ROWS, len(mask))
+                    block_mask = mask[start:end]
+                    if block_mask.any():
+                        block_scores = queries @ self._load_vectors(start, end).T
+                        block_scores[:, ~block_mask] = -np.inf
+                        scores[:, start:end] = block_scores
+
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                for query_row, rows in enumerate(top):
+                    order = np.argsort(-scores[query_row, rows], kind="stable")
+                    all_rows.append(rows[order].tolist())
+                    all_scores.append(scores[query_row, rows[order]].tolist())
+            else:
+                all_rows = [[] for _ in queries]
+                all_scores = [[] for _ in queries]
+
+            return {
+                "ids": [[self._ids[row] for row in rows] for rows in all_rows],
+                "distances": ([[1.0 - score for score in scores] for scores in all_scores]
+                              if "distances" in include else None),
+                "metadatas": ([[self._metadatas[row] for row in rows] for rows in all_rows]
+                              if "metadatas" in include else None),
+                "documents": ([self._documents(rows) for rows in all_rows]
+                              if "documents" in include else None),
+                "embeddings": ([self._load_rows(rows).tolist() for rows in all_rows]
+                               if "embeddings" in include else None)
+            }
+
+
+class FlatVectorClient:
+    """
+    Client for flat collections stored as subdirectories of one path
+    """
+
+    def __init__(self, path: str, quantization: str = "float16"):
+        self.path = path
+        self.quantization = quantization
+        self._collections = {}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def get_or_create_collection(self, name: str, metadata: Dict = None,
+                                 embedding_function=None) -> FlatVectorCollection:
+        # Only cosine space is supported; the HNSW metadata Chroma takes is ignored
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = FlatVectorCollection(os.path.join(self.path, name), name,
+                                                  embedding_function, self.quantization)
+                self._collections[name] = collection
+            elif embedding_function is not None:
+                collection.embedding_function = embedding_function
+            return collection
+
+    def list_collections(self) -> List[FlatVectorCollection]:
+        names = sorted(entry for entry in os.listdir(self.path)
+                       if os.path.isdir(os.path.join(self.path, entry)))
+        return [self.get_or_create_collection(name) for name in names]
+
+    def delete_collection(self, name: str):
+        with self._lock:
+            collection = self._collections.pop(name, None)
+            if collection is not None:
+                collection._conn.close()
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
@@ -0,0 +1,323 @@
+import os
+import re
+import math
+import heapq
+import json
+import bisect
+import threading
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+# Metadata fields the stats index keeps counts for
+STATS_FIELDS = ["type", "sector", "source"]
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Parse the publish dates returned by the news providers into a UTC epoch"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            # Alpha Vantage uses a compact 20240115T103000 form
+            parsed = datetime.strptime(text, "%Y%m%dT%H%M%S")
+        except ValueError:
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class MetadataStatsIndex:
+    """
+    Persistent document counts by type, sector, source and publish date,
+    maintained incrementally on every write so stats lookups are O(1)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                self.total = data["total"]
+                self.counts = data["counts"]
+                self.version = data.get("version", 0)
+            except (OSError, ValueError, KeyError):
+                self._reset()
+
+    def _reset(self):
+        self.total = 0
+        self.counts = {field: {} for field in STATS_FIELDS + ["date"]}
+        self.version = 0
+
+    def _keys(self, metadata: Dict[str, Any]) -> List[tuple]:
+        keys = [(field, str(metadata[field])) for field in STATS_FIELDS if metadata.get(field)]
+        timestamp = metadata.get("published_ts") or parse_timestamp(metadata.get("published_at"))
+        if timestamp:
+            day = datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+            keys.append(("date", day))
+        return keys
+
+    def _apply(self, metadata: Dict[str, Any], delta: int):
+        self.total += delta
+        for field, value in self._keys(metadata):
+            bucket = self.counts[field]
+            bucket[value] = bucket.get(value, 0) + delta
+            if bucket[value] <= 0:
+                del bucket[value]
+
+    def update(self, added: List[Dict[str, Any]] = (), removed: List[Dict[str, Any]] = ()):
+        """Apply a batch of added and removed metadata records and persist"""
+        with self._lock:
+            for metadata in removed:
+                self._apply(metadata or {}, -1)
+            for metadata in added:
+                self._apply(metadata or {}, 1)
+            self.version += 1
+            self._save()
+
+    def rebuild(self, metadatas: List[Dict[str, Any]]):
+        """Recount from scratch, e.g. when the index file is missing or stale"""
+        with self._lock:
+            version = self.version
+            self._reset()
+            for metadata in metadatas:
+                self._apply(metadata or {}, 1)
+            self.version = version + 1
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"total": self.total, "counts": self.counts, "version": self.version}, f)
+        os.replace(tmp_path, self.path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "total": self.total,
+                "by_type": dict(self.counts["type"]),
+                "by_sector": dict(self.counts["sector"]),
+                "by_source": dict(self.counts["source"]),
+                "by_date": dict(self.counts["date"]),
+                "version": self.version
+            }
+
+
+class RecencyIndex:
+    """
+    In-memory time-ordered index of news documents for range scans by publish time
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []  # Sorted (published_ts, doc_id)
+        self._entries = {}  # doc_id -> (published_ts, category, source)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, doc_id: str, published_ts: float, category: str = "", source: str = ""):
+        with self._lock:
+            self._remove(doc_id)
+            bisect.insort(self._keys, (published_ts, doc_id))
+            self._entries[doc_id] = (published_ts, category, source)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        entry = self._entries.pop(doc_id, None)
+        if entry is not None:
+            position = bisect.bisect_left(self._keys, (entry[0], doc_id))
+            del self._keys[position]
+
+    def latest(self, since: float = None, category: str = None, limit: int = None) -> List[str]:
+        """IDs published at or after `since`, newest first"""
+        with self._lock:
+            start = bisect.bisect_left(self._keys, (since, "")) if since is not None else 0
+            ids = []
+            for position in range(len(self._keys) - 1, start - 1, -1):
+                doc_id = self._keys[position][1]
+                if category and self._entries[doc_id][1] != category:
+                    continue
+                ids.append(doc_id)
+                if limit and len(ids) >= limit:
+                    break
+            return ids
+
+    def older_than(self, cutoff: float) -> List[str]:
+        """IDs published strictly before `cutoff`, oldest first"""
+        with self._lock:
+            end = bisect.bisect_left(self._keys, (cutoff, ""))
+            return [doc_id for _, doc_id in self._keys[:end]]
+
+    def entries(self) -> Dict[str, tuple]:
+        with self._lock:
+            return dict(self._entries)
+
+
+class CompanyColumnIndex:
+    """
+    In-memory columnar index over company metadata for vectorized structured filters
+    """
+
+    STRING_COLUMNS = ["company_name", "sector", "location", "credit_rating", "risk_level", "market_outlook"]
+    NUMERIC_COLUMNS = ["founded_year", "employee_count"]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}  # doc_id -> row number
+        self._ids = []
+        self._valid = []
+        self._values = {column: [] for column in self.STRING_COLUMNS + self.NUMERIC_COLUMNS}
+        self._arrays = None  # Materialized NumPy columns, rebuilt lazily after writes
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def upsert(self, doc_id: str, metadata: Dict[str, Any]):
+        with self._lock:
+            row = self._rows.get(doc_id)
+            if row is None:
+                row = len(self._ids)
+                self._rows[doc_id] = row
+                self._ids.append(doc_id)
+                self._valid.append(True)
+                for values in self._values.values():
+                    values.append(None)
+
+            for column in self.STRING_COLUMNS:
+                self._values[column][row] = str(metadata.get(column, ""))
+            for column in self.NUMERIC_COLUMNS:
+                self._values[column][row] = float(metadata.get(column) or 0)
+            self._valid[row] = True
+            self._arrays = None
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            row = self._rows.pop(doc_id, None)
+            if row is not None:
+                self._valid[row] = False
+                self._arrays = None
+
+    def _materialize(self) -> Dict[str, np.ndarray]:
+        if self._arrays is None:
+            arrays = {"_id": np.array(self._ids, dtype=object), "_valid": np.array(self._valid, dtype=bool)}
+            for column in self.STRING_COLUMNS:
+                arrays[column] = np.array(self._values[column], dtype=object)
+            for column in self.NUMERIC_COLUMNS:
+                arrays[column] = np.array(self._values[column], dtype=np.float64)
+            self._arrays = arrays
+        return self._arrays
+
+    def select(self, equals: Dict[str, Any] = None, minimums: Dict[str, float] = None,
+               maximums: Dict[str, float] = None, sort_by: str = None,
+               descending: bool = True, limit: int = None) -> List[str]:
+        """IDs of every company matching all predicates, optionally sorted by a column"""
+        with self._lock:
+            arrays = self._materialize()
+            mask = arrays["_valid"].copy()
+
+            for column, value in (equals or {}).items():
+                mask &= arrays[column] == value
+            for column, value in (minimums or {}).items():
+                mask &= arrays[column] >= value
+            for column, value in (maximums or {}).items():
+                mask &= arrays[column] <= value
+
+            rows = np.flatnonzero(mask)
+            if sort_by:
+                order = np.argsort(arrays[sort_by][rows], kind="stable")
+                rows = rows[order[::-1]] if descending else rows[order]
+            if limit:
+                rows = rows[:limit]
+
+            return arrays["_id"][rows].tolist()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; keeps numbers so codes like "ISO 14001" stay searchable"""
+    return re.findall(r"\w+", text.lower())
+
+
+class BM25Index:
+    """
+    In-memory inverted index scoring documents with Okapi BM25
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings = {}  # term -> {doc_id: term frequency}
+        self._doc_terms = {}  # doc_id -> terms, for removal
+        self._doc_lengths = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, doc_id: str, text: str):
+        tokens = tokenize(text)
+        frequencies = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+
+        with self._lock:
+            self._remove(doc_id)
+            for term, frequency in frequencies.items():
+                self._postings.setdefault(term, {})[doc_id] = frequency
+            self._doc_terms[doc_id] = list(frequencies)
+            self._doc_lengths[doc_id] = len(tokens)
+            self._total_length += len(tokens)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def search(self, query: str, k: int = 10) -> List[tuple]:
+        """Top-k (doc_id, score) pairs for the query terms"""
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count:
+                return []
+            average_length = self._total_length / doc_count
+
+            scores = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
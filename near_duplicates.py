@@ -0,0 +1,123 @@
+import re
+import zlib
+import threading
+from typing import List, Dict, Any, Optional
+import numpy as np
+import config
+
+# Mersenne prime for the universal hash family (uint64 overflow just wraps, harmless for hashing)
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse punctuation so formatting differences don't count as changes"""
+    return re.sub(r"[^a-z0-9]+", " ", (text or "").lower()).strip()
+
+
+def shingles(text: str, size: int = None) -> set:
+    """Character k-grams of the normalized text (the whole text if shorter than k)"""
+    size = size or config.NEAR_DUPLICATE_SHINGLE_SIZE
+    text = normalize_text(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def article_text(article: Dict[str, Any]) -> str:
+    """The part of an article that syndicated copies share (source and date lines differ)"""
+    return f"{article.get('title', '')} {article.get('description', '')}"
+
+
+class MinHasher:
+    """
+    MinHash signatures over shingle sets; matching signature slots estimate Jaccard similarity
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set: set) -> np.ndarray:
+        if not shingle_set:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.array([zlib.crc32(s.encode("utf-8")) for s in shingle_set], dtype=np.uint64)
+        # (num_shingles, num_perm) permuted hashes, min over shingles per permutation
+        permuted = (hashes[:, None] * self._a[None, :] + self._b[None, :]) % _PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        return float(np.mean(first == second))
+
+
+class NearDuplicateIndex:
+    """
+    Banded LSH index over MinHash signatures for sub-linear near-duplicate lookups
+    """
+
+    def __init__(self, threshold: float = None, num_perm: int = None, bands: int = None):
+        self.threshold = threshold if threshold is not None else config.NEAR_DUPLICATE_THRESHOLD
+        num_perm = num_perm or config.NEAR_DUPLICATE_NUM_PERM
+        self.bands = bands or config.NEAR_DUPLICATE_BANDS
+        if num_perm % self.bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({self.bands})")
+        self.rows = num_perm // self.bands
+        self.hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+        self._buckets = [{} for _ in range(self.bands)]  # band -> {band bytes: {key}}
+        self._signatures = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.hasher.signature(shingles(text))
+
+    def add(self, key: str, text: str = None, signature: np.ndarray = None):
+        if signature is None:
+            signature = self.signature(text)
+        with self._lock:
+            self._remove(key)
+            self._signatures[key] = signature
+            for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+                buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band_key]
+
+    def find(self, text: str = None, signature: np.ndarray = None, exclude: str = None) -> Optional[tuple]:
+        """Most similar indexed (key, similarity) at or above the threshold, or None"""
+        if signature is None:
+            signature = self.signature(text)
+        with self._lock:
+            candidates = set()
+            for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+                candidates |= buckets.get(band_key, set())
+            candidates.discard(exclude)
+            if not candidates:
+                return None
+            keys = list(candidates)
+            # LSH only proposes candidates; the signature estimate decides
+            similarities = np.mean(np.stack([self._signatures[key] for key in keys]) == signature, axis=1)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        return keys[best], float(similarities[best])
@@ -1,9 +1,63 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from datetime import datetime, timedelta
+import random
+import threading
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any
 import config
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from indexes import parse_timestamp
+from near_duplicates import NearDuplicateIndex, article_text
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+
+# One budget per provider for the whole process, however many aggregators exist
+RATE_LIMITER = RateLimiter(config.NEWS_RATE_LIMITS, config.NEWS_RATE_LIMIT_STATE_PATH)
+
+RESPONSE_CACHE = ResponseCache(
+    config.NEWS_RESPONSE_CACHE_PATH,
+    secret_params=config.NEWS_API_SECRET_PARAMS,
+    retention_seconds=config.NEWS_RESPONSE_CACHE_RETENTION_SECONDS
+) if config.NEWS_RESPONSE_CACHE_ENABLED else None
+
+# Keep-alive sessions per provider, shared process-wide so connections are reused across fetches
+_SESSIONS = {}
+_RETRY_COUNTS = {}
+_SESSIONS_LOCK = threading.Lock()
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Some providers report errors (bad key, exhausted quota) in a 200 response; a body failing
+# its provider's check is treated as a failed call and never cached
+VALID_PAYLOADS = {
+    "newsdata": lambda data: isinstance(data, dict) and data.get("status") == "success",
+    "finnhub": lambda data: isinstance(data, list),
+    "alpha_vantage": lambda data: isinstance(data, dict) and "feed" in data
+}
+
+
+def _valid_payload(provider: str, data: Any) -> bool:
+    check = VALID_PAYLOADS.get(provider)
+    return check is None or check(data)
+
+# Provider calls of every aggregator in the process; ones that miss the deadline keep running
+# here unwaited. Threads start on demand and are reused, so new aggregators add none.
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=config.NEWS_FETCH_WORKERS, thread_name_prefix="news-fetch")
+
+
+def _provider_session(provider: str) -> requests.Session:
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(provider)
+        if session is None:
+            session = requests.Session()
+            # Retries are done by hand so every attempt goes through the rate limiter
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.NEWS_HTTP_POOL_SIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+            _SESSIONS[provider] = session
+        return session
 
 class NewsAggregator:
     """
@@ -13,6 +67,11 @@ class NewsAggregator:
     def __init__(self):
         self.apis = config.NEWS_APIS
         self.sector_keywords = config.SECTOR_KEYWORDS
+        self.rate_limiter = RATE_LIMITER
+        self.response_cache = RESPONSE_CACHE
+        # Provider -> {"status", "seconds", "articles"} for the most recent fetch. A copy for
+        # convenience only: aggregators shared across threads should use _fetch_providers' own result.
+        self.last_fetch_timings = {}
 
     def fetch_newsdata_io(self, query_keywords: List[str] = None) -> List[Dict]:
         """Fetch news from NewsData.io API"""
@@ -21,28 +80,25 @@ class NewsAggregator:
             if query_keywords:
                 params["q"] = " OR ".join(query_keywords[:5])  # Limit keywords
 
-            response = requests.get(self.apis["newsdata"]["url"], params=params, timeout=10)
-
-            if response.status_code == 200:
-                data = response.json()
-                articles = []
-
-                for article in data.get("results", []):
-                    articles.append({
-                        "source": "NewsData.io",
-                        "title": article.get("title", ""),
-                        "description": article.get("description", ""),
-                        "content": article.get("content", ""),
-                        "url": article.get("link", ""),
-                        "published_at": article.get("pubDate", ""),
-                        "source_name": article.get("source_id", ""),
-                        "category": article.get("category", ["business"])[0] if article.get("category") else "business"
-                    })
-                return articles
-            else:
-                print(f"NewsData.io API error: {response.status_code}")
+            data = self._get_json("newsdata", params, timeout=10)
+            if data is None:
                 return []
 
+            articles = []
+
+            for article in data.get("results", []):
+                articles.append({
+                    "source": "NewsData.io",
+                    "title": article.get("title", ""),
+                    "description": article.get("description", ""),
+                    "content": article.get("content", ""),
+                    "url": article.get("link", ""),
+                    "published_at": article.get("pubDate", ""),
+                    "source_name": article.get("source_id", ""),
+                    "category": article.get("category", ["business"])[0] if article.get("category") else "business"
+                })
+            return articles
+
         except Exception as e:
             print(f"Error fetching NewsData.io: {str(e)}")
             return []
@@ -54,28 +110,25 @@ class NewsAggregator:
             if symbol:
                 params["symbol"] = symbol
 
-            response = requests.get(self.apis["finnhub"]["url"], params=params, timeout=10)
-
-            if response.status_code == 200:
-                articles_data = response.json()
-                articles = []
-
-                for article in articles_data:
-                    articles.append({
-                        "source": "Finnhub",
-                        "title": article.get("headline", ""),
-                        "description": article.get("summary", ""),
-                        "content": article.get("summary", ""),
-                        "url": article.get("url", ""),
-                        "published_at": datetime.fromtimestamp(article.get("datetime", 0)).isoformat(),
-                        "source_name": article.get("source", ""),
-                        "category": "financial"
-                    })
-                return articles
-            else:
-                print(f"Finnhub API error: {response.status_code}")
+            articles_data = self._get_json("finnhub", params, timeout=10)
+            if articles_data is None:
                 return []
 
+            articles = []
+
+            for article in articles_data:
+                articles.append({
+                    "source": "Finnhub",
+                    "title": article.get("headline", ""),
+                    "description": article.get("summary", ""),
+                    "content": article.get("summary", ""),
+                    "url": article.get("url", ""),
+                    "published_at": datetime.fromtimestamp(article.get("datetime", 0), tz=timezone.utc).isoformat(),
+                    "source_name": article.get("source", ""),
+                    "category": "financial"
+                })
+            return articles
+
         except Exception as e:
             print(f"Error fetching Finnhub: {str(e)}")
             return []
@@ -87,31 +140,28 @@ class NewsAggregator:
             if topics:
                 params["topics"] = ",".join(topics[:3])  # Limit topics
 
-            response = requests.get(self.apis["alpha_vantage"]["url"], params=params, timeout=15)
-
-            if response.status_code == 200:
-                data = response.json()
-                articles = []
-
-                feed = data.get("feed", [])
-                for article in feed[:10]:  # Limit to 10 articles
-                    articles.append({
-                        "source": "Alpha Vantage",
-                        "title": article.get("title", ""),
-                        "description": article.get("summary", ""),
-                        "content": article.get("summary", ""),
-                        "url": article.get("url", ""),
-                        "published_at": article.get("time_published", ""),
-                        "source_name": article.get("source", ""),
-                        "category": "market_sentiment",
-                        "sentiment": article.get("overall_sentiment_label", "neutral"),
-                        "sentiment_score": article.get("overall_sentiment_score", 0.0)
-                    })
-                return articles
-            else:
-                print(f"Alpha Vantage API error: {response.status_code}")
+            data = self._get_json("alpha_vantage", params, timeout=15)
+            if data is None:
                 return []
 
+            articles = []
+
+            feed = data.get("feed", [])
+            for article in feed[:10]:  # Limit to 10 articles
+                articles.append({
+                    "source": "Alpha Vantage",
+                    "title": article.get("title", ""),
+                    "description": article.get("summary", ""),
+                    "content": article.get("summary", ""),
+                    "url": article.get("url", ""),
+                    "published_at": article.get("time_published", ""),
+                    "source_name": article.get("source", ""),
+                    "category": "market_sentiment",
+                    "sentiment": article.get("overall_sentiment_label", "neutral"),
+                    "sentiment_score": article.get("overall_sentiment_score", 0.0)
+                })
+            return articles
+
         except Exception as e:
             print(f"Error fetching Alpha Vantage: {str(e)}")
             return []
@@ -123,91 +173,250 @@ class NewsAggregator:
             if keywords:
                 params["search"] = " ".join(keywords[:3])
 
-            response = requests.get(self.apis["marketaux"]["url"], params=params, timeout=10)
-
-            if response.status_code == 200:
-                data = response.json()
-                articles = []
-
-                for article in data.get("data", []):
-                    articles.append({
-                        "source": "MarketAux",
-                        "title": article.get("title", ""),
-                        "description": article.get("description", ""),
-                        "content": article.get("snippet", ""),
-                        "url": article.get("url", ""),
-                        "published_at": article.get("published_at", ""),
-                        "source_name": article.get("source", ""),
-                        "category": "market_news"
-                    })
-                return articles
-            else:
-                print(f"MarketAux API error: {response.status_code}")
+            data = self._get_json("marketaux", params, timeout=10)
+            if data is None:
                 return []
 
+            articles = []
+
+            for article in data.get("data", []):
+                articles.append({
+                    "source": "MarketAux",
+                    "title": article.get("title", ""),
+                    "description": article.get("description", ""),
+                    "content": article.get("snippet", ""),
+                    "url": article.get("url", ""),
+                    "published_at": article.get("published_at", ""),
+                    "source_name": article.get("source", ""),
+                    "category": "market_news"
+                })
+            return articles
+
         except Exception as e:
             print(f"Error fetching MarketAux: {str(e)}")
             return []
 
+    def _get_json(self, provider: str, params: Dict[str, Any], timeout: float) -> Any:
+        """
+        GET a provider endpoint over its pooled session, retrying 429/5xx responses and
+        connection errors with jittered exponential backoff. Retries never spend more of
+        a daily quota, and a 429 from a daily-quota provider is not retried. Returns the
+        parsed JSON, or None when the call was skipped or failed (including error bodies
+        sent with a 200, see VALID_PAYLOADS).
+
+        Responses younger than the provider's TTL are served from the response cache
+        without a request; older ones are revalidated with their ETag/Last-Modified.
+        """
+        url = self.apis[provider]["url"]
+        cache = self.response_cache
+        cache_key = cached = None
+        if cache is not None:
+            cache_key = cache.key(provider, url, params)
+            cached = cache.get(cache_key)
+            if cached and not _valid_payload(provider, json.loads(cached["body"])):
+                cached = None  # An error body cached before it was recognised as one
+            if cached and cached["age"] < config.NEWS_CACHE_TTL_SECONDS.get(provider, 0):
+                cache.record("hit", len(cached["body"]))
+                return json.loads(cached["body"])
+
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        session = _provider_session(provider)
+        attempts = config.NEWS_HTTP_MAX_RETRIES + 1
+        # A daily quota is charged once per logical request; a 429 there means it is spent
+        daily_quota = bool(self.rate_limiter.limits.get(provider, {}).get("per_day"))
+        for attempt in range(attempts):
+            if not self._within_rate_limit(provider, retry=attempt > 0):
+                return None
+
+            delay = None
+            try:
+                response = session.get(url, params=params, headers=headers, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == attempts - 1:
+                    raise
+                print(f"{provider} request failed ({str(e)}), retrying")
+            else:
+                if response.status_code == 304 and cached:
+                    cache.touch(cache_key)
+                    cache.record("revalidated", len(cached["body"]))
+                    return json.loads(cached["body"])
+                if response.status_code == 200:
+                    data = response.json()
+                    if not _valid_payload(provider, data):
+                        detail = data if not isinstance(data, dict) else (
+                            data.get("Information") or data.get("Note") or data.get("message") or data)
+                        print(f"{provider} API error: {str(detail)[:200]}")
+                        return None
+                    if cache is not None:
+                        cache.put(cache_key, provider, response.content,
+                                  etag=response.headers.get("ETag"),
+                                  last_modified=response.headers.get("Last-Modified"))
+                        cache.record("miss")
+                    return data
+                if (response.status_code not in RETRY_STATUSES or attempt == attempts - 1
+                        or (response.status_code == 429 and daily_quota)):
+                    print(f"{provider} API error: {response.status_code}")
+                    return None
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = float(retry_after)
+
+            if delay is None:
+                delay = config.NEWS_HTTP_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.0)
+            with _SESSIONS_LOCK:
+                _RETRY_COUNTS[provider] = _RETRY_COUNTS.get(provider, 0) + 1
+            time.sleep(min(delay, config.NEWS_HTTP_MAX_BACKOFF_SECONDS))
+        return None
+
+    def get_http_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-provider request, connection and retry counters from the urllib3 pools"""
+        stats = {}
+        for provider in self.apis:
+            with _SESSIONS_LOCK:
+                session = _SESSIONS.get(provider)
+                retries = _RETRY_COUNTS.get(provider, 0)
+            requests_made, connections = 0, 0
+            if session is not None:
+                pools = session.get_adapter(self.apis[provider]["url"]).poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is not None:
+                        requests_made += pool.num_requests
+                        connections += pool.num_connections
+            stats[provider] = {
+                "requests": requests_made,
+                "connections": connections,
+                "reused": requests_made - connections,
+                "retries": retries
+            }
+        return stats
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Response cache hits, misses, 304 revalidations and bytes not downloaded"""
+        if self.response_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.response_cache.get_stats()}
+
+    def _within_rate_limit(self, provider: str, retry: bool = False) -> bool:
+        """Consult the provider's budget before a call, waiting briefly for per-minute tokens"""
+        if self.rate_limiter.acquire(provider, max_wait=config.NEWS_RATE_LIMIT_MAX_WAIT_SECONDS,
+                                     count_daily=not retry):
+            return True
+        print(f"Skipping {provider}: rate limit budget exhausted")
+        return False
+
     def fetch_sector_news(self, sector: str, limit: int = 20) -> List[Dict]:
         """Fetch news for a specific MSME sector"""
         sector_keywords = self.sector_keywords.get(sector, [])
-        all_articles = []
 
         # Fetch from all APIs
         print(f"Fetching news for {sector} sector...")
-
-        # NewsData.io
-        articles_newsdata = self.fetch_newsdata_io(sector_keywords)
-        all_articles.extend(articles_newsdata)
-        time.sleep(1)  # Rate limiting
-
-        # Finnhub (general financial news)
-        articles_finnhub = self.fetch_finnhub()
-        all_articles.extend(articles_finnhub)
-        time.sleep(1)
-
-        # Alpha Vantage
-        articles_alpha = self.fetch_alpha_vantage([sector.lower()])
-        all_articles.extend(articles_alpha)
-        time.sleep(1)
-
-        # MarketAux
-        articles_market = self.fetch_marketaux(sector_keywords)
-        all_articles.extend(articles_market)
+        all_articles, self.last_fetch_timings = self._fetch_providers({
+            "newsdata": lambda: self.fetch_newsdata_io(sector_keywords),
+            "finnhub": lambda: self.fetch_finnhub(),  # General financial news
+            "alpha_vantage": lambda: self.fetch_alpha_vantage([sector.lower()]),
+            "marketaux": lambda: self.fetch_marketaux(sector_keywords)
+        })
 
         # Filter and deduplicate
-        filtered_articles = self._filter_by_relevance(all_articles, sector_keywords)
+        filtered_articles = self._deduplicate_articles(
+            self._filter_by_relevance(all_articles, sector_keywords)
+        )
 
         return filtered_articles[:limit]
 
     def fetch_all_news(self, limit: int = 50) -> List[Dict]:
         """Fetch general business and market news"""
-        all_articles = []
-
         print("Fetching general business news...")
 
         # Fetch from all APIs
-        articles_newsdata = self.fetch_newsdata_io()
-        all_articles.extend(articles_newsdata)
-        time.sleep(1)
-
-        articles_finnhub = self.fetch_finnhub()
-        all_articles.extend(articles_finnhub)
-        time.sleep(1)
-
-        articles_alpha = self.fetch_alpha_vantage()
-        all_articles.extend(articles_alpha)
-        time.sleep(1)
-
-        articles_market = self.fetch_marketaux()
-        all_articles.extend(articles_market)
+        all_articles, self.last_fetch_timings = self._fetch_providers({
+            "newsdata": lambda: self.fetch_newsdata_io(),
+            "finnhub": lambda: self.fetch_finnhub(),
+            "alpha_vantage": lambda: self.fetch_alpha_vantage(),
+            "marketaux": lambda: self.fetch_marketaux()
+        })
 
         # Remove duplicates and sort by date
         unique_articles = self._deduplicate_articles(all_articles)
 
         return unique_articles[:limit]
 
+    def fetch_all_sectors(self, limit: int = 20, sectors: List[str] = None) -> Dict[str, List[Dict]]:
+        """
+        Fetch news for every MSME sector (or just `sectors`) with one call per provider.
+        The general feeds are fetched once and each article is matched against all
+        sectors' keywords in a single pass, so a full refresh makes 4 provider calls
+        instead of 4 per sector. The feeds are not keyword-targeted, so for a single
+        sector fetch_sector_news finds more.
+        """
+        sectors = sectors or list(self.sector_keywords)
+        print(f"Fetching news for {len(sectors)} sectors...")
+
+        all_articles, self.last_fetch_timings = self._fetch_providers({
+            "newsdata": lambda: self.fetch_newsdata_io(),
+            "finnhub": lambda: self.fetch_finnhub(),
+            "alpha_vantage": lambda: self.fetch_alpha_vantage(),
+            "marketaux": lambda: self.fetch_marketaux()
+        })
+
+        # Deduplicated and sorted newest first once, so every sector list keeps that order
+        sector_news = self._classify_by_sector(self._deduplicate_articles(all_articles), sectors)
+        return {sector: articles[:limit] for sector, articles in sector_news.items()}
+
+    def _fetch_providers(self, calls: Dict[str, Any], deadline: float = None) -> tuple:
+        """
+        Call every configured provider, concurrently unless config.NEWS_FETCH_CONCURRENT is off.
+        Returns the articles that arrived within the deadline, in provider order, and this
+        fetch's per-provider timings.
+        """
+        deadline = deadline if deadline is not None else config.NEWS_FETCH_DEADLINE_SECONDS
+        timings = {name: {"status": "not_configured", "seconds": 0.0, "articles": 0} for name in calls}
+        configured = [name for name in calls if self.apis[name].get("key")]
+
+        def timed(name: str) -> tuple:
+            start = time.perf_counter()
+            articles = calls[name]()
+            return articles, time.perf_counter() - start
+
+        results = {}
+
+        def record(name: str, outcome):
+            # Only this thread writes timings, so a late straggler cannot change them
+            try:
+                articles, seconds = outcome()
+            except Exception as e:
+                timings[name]["status"] = "error"
+                print(f"Error fetching {name}: {str(e)}")
+                return
+            results[name] = articles
+            timings[name].update(status="ok", seconds=seconds, articles=len(articles))
+
+        if config.NEWS_FETCH_CONCURRENT:
+            futures = {name: _FETCH_EXECUTOR.submit(timed, name) for name in configured}
+            done, _ = wait(futures.values(), timeout=deadline)
+            for name, future in futures.items():
+                if future in done:
+                    record(name, future.result)
+                else:
+                    timings[name].update(status="timeout", seconds=deadline)
+                    print(f"{name} missed the {deadline:.0f}s news fetch deadline")
+        else:
+            started = time.perf_counter()
+            for name in configured:
+                if time.perf_counter() - started >= deadline:
+                    timings[name]["status"] = "timeout"
+                    continue
+                record(name, lambda: timed(name))
+
+        return [article for name in calls for article in results.get(name, [])], timings
+
     def _filter_by_relevance(self, articles: List[Dict], keywords: List[str]) -> List[Dict]:
         """Filter articles by keyword relevance"""
         filtered = []
@@ -225,25 +434,44 @@ class NewsAggregator:
 
         return filtered
 
+    def _classify_by_sector(self, articles: List[Dict], sectors: List[str]) -> Dict[str, List[Dict]]:
+        """Assign each article to every sector whose keywords it mentions (same matching as _filter_by_relevance)"""
+        sector_keywords = {
+            sector: [k.lower() for k in self.sector_keywords.get(sector, [])] for sector in sectors
+        }
+        classified = {sector: [] for sector in sectors}
+
+        for article in articles:
+            # Lowercase the article once rather than once per sector
+            fields = [(article.get(field) or "").lower() for field in ("title", "description", "content")]
+            for sector, keywords in sector_keywords.items():
+                if any(keyword in field for keyword in keywords for field in fields):
+                    classified[sector].append(article)
+
+        return classified
+
     def _deduplicate_articles(self, articles: List[Dict]) -> List[Dict]:
         """Remove duplicate articles based on title similarity"""
         unique_articles = []
         seen_titles = set()
+        # Syndicated copies of a story differ slightly in headline and summary across providers
+        near_duplicates = NearDuplicateIndex() if config.NEAR_DUPLICATE_THRESHOLD else None
 
         for article in articles:
-            title = article.get("title", "").lower().strip()
-            if title and title not in seen_titles:
-                seen_titles.add(title)
-                unique_articles.append(article)
-
-        # Sort by published date (most recent first)
-        try:
-            unique_articles.sort(
-                key=lambda x: datetime.fromisoformat(x.get("published_at", "").replace("Z", "+00:00")),
-                reverse=True
-            )
-        except:
-            pass  # Keep original order if date parsing fails
+            title = (article.get("title") or "").lower().strip()
+            if not title or title in seen_titles:
+                continue
+            if near_duplicates is not None:
+                signature = near_duplicates.signature(article_text(article))
+                if near_duplicates.find(signature=signature):
+                    continue
+                near_duplicates.add(str(len(unique_articles)), signature=signature)
+            seen_titles.add(title)
+            unique_articles.append(article)
+
+        # Sort by published date (most recent first); providers mix naive, UTC and compact
+        # timestamps, and undated or unparseable articles go last
+        unique_articles.sort(key=lambda x: parse_timestamp(x.get("published_at")) or 0.0, reverse=True)
 
         return unique_articles
 
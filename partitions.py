@@ -0,0 +1,313 @@
+import re
+import threading
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+import config
+
+RESULT_FIELDS = ["ids", "distances", "metadatas", "documents", "embeddings"]
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", value.lower()).strip("_") or "other"
+
+
+def _constraints(where: Optional[Dict[str, Any]]) -> Dict[str, List[tuple]]:
+    """Field -> [(operator, value)] constraints that must all hold (top level and $and only)"""
+    found = {}
+    for key, condition in (where or {}).items():
+        if key == "$and":
+            for clause in condition:
+                for field, items in _constraints(clause).items():
+                    found.setdefault(field, []).extend(items)
+        elif key.startswith("$"):
+            continue  # $or cannot narrow the partitions
+        elif isinstance(condition, dict):
+            found.setdefault(key, []).extend(condition.items())
+        else:
+            found.setdefault(key, []).append(("$eq", condition))
+    return found
+
+
+class PartitionedCollection:
+    """
+    Routes a collection-style API over one company collection (optionally one per
+    sector) and monthly news collections, querying only partitions a filter allows
+    """
+
+    def __init__(self, client, embedding_function=None, collection_metadata: Dict = None):
+        self.client = client
+        self.embedding_function = embedding_function
+        self.collection_metadata = collection_metadata
+        self.name = config.COLLECTION_NAME
+        self._lock = threading.Lock()
+        self._partitions = {}
+        # doc_id -> partition name, loaded on the first write and kept current afterwards.
+        # Other workers of a shared Chroma server can move documents, so it is not used there.
+        self._track_locations = not (config.VECTOR_BACKEND == "chroma" and config.CHROMA_CLIENT_MODE == "http")
+        self._locations = None
+
+        for collection in client.list_collections():
+            if self._kind(collection.name):
+                self._open(collection.name)
+
+    # ------------------------------------------------------------------ layout
+
+    def _kind(self, name: str) -> Optional[str]:
+        if name.startswith(config.COMPANY_COLLECTION_NAME):
+            return "company"
+        if name.startswith(config.NEWS_COLLECTION_PREFIX):
+            return "news"
+        if name == config.OTHER_COLLECTION_NAME:
+            return "other"
+        return None
+
+    def _open(self, name: str):
+        with self._lock:
+            if name not in self._partitions:
+                self._partitions[name] = self.client.get_or_create_collection(
+                    name=name, metadata=self.collection_metadata, embedding_function=self.embedding_function
+                )
+            return self._partitions[name]
+
+    def _partition_name(self, metadata: Dict[str, Any]) -> str:
+        doc_type = metadata.get("type")
+        if doc_type == "company":
+            if config.PARTITION_COMPANIES_BY_SECTOR:
+                return f"{config.COMPANY_COLLECTION_NAME}_{_slug(str(metadata.get('sector', '')))}"
+            return config.COMPANY_COLLECTION_NAME
+        if doc_type == "news":
+            published_ts = metadata.get("published_ts") or 0
+            if not published_ts:
+                return f"{config.NEWS_COLLECTION_PREFIX}undated"
+            month = datetime.fromtimestamp(published_ts, tz=timezone.utc).strftime(config.NEWS_PARTITION_FORMAT)
+            return f"{config.NEWS_COLLECTION_PREFIX}{month}"
+        return config.OTHER_COLLECTION_NAME
+
+    def news_partition_range(self, name: str) -> Optional[tuple]:
+        """[start, end) epoch range covered by a news partition, None if undated"""
+        label = name[len(config.NEWS_COLLECTION_PREFIX):]
+        try:
+            start = datetime.strptime(label, config.NEWS_PARTITION_FORMAT).replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+        end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+        return start.timestamp(), end.timestamp()
+
+    def _location_map(self) -> Dict[str, str]:
+        """Partition holding every stored ID, listed once per process"""
+        with self._lock:
+            if self._locations is None:
+                locations = {}
+                for name, collection in self._partitions.items():
+                    offset = 0
+                    while True:
+                        page_ids = collection.get(include=[], limit=config.INGEST_BATCH_SIZE, offset=offset)["ids"]
+                        if not page_ids:
+                            break
+                        locations.update(dict.fromkeys(page_ids, name))
+                        offset += len(page_ids)
+                self._locations = locations
+            return self._locations
+
+    def partitions(self, kind: str = None) -> Dict[str, Any]:
+        with self._lock:
+            return {name: collection for name, collection in self._partitions.items()
+                    if kind is None or self._kind(name) == kind}
+
+    def _route(self, where: Dict[str, Any] = None, ids: List[str] = None) -> List[str]:
+        """Partitions that can hold documents matching the filter (and ID prefixes)"""
+        constraints = _constraints(where)
+        kinds = {"company", "news", "other"}
+
+        types = [value for operator, value in constraints.get("type", []) if operator == "$eq"]
+        if types:
+            kinds &= set(types)
+        # Only company documents carry sector metadata
+        if any(operator == "$eq" for operator, _ in constraints.get("sector", [])):
+            kinds &= {"company"}
+        if ids is not None:
+            # IDs are prefixed with their document type (company_..., news_...)
+            prefixes = {doc_id.split("_", 1)[0] for doc_id in ids}
+            kinds &= {prefix if prefix in ("company", "news") else "other" for prefix in prefixes}
+
+        sectors = {_slug(str(value)) for operator, value in constraints.get("sector", []) if operator == "$eq"}
+        low, high = float("-inf"), float("inf")
+        for operator, value in constraints.get("published_ts", []):
+            if operator in ("$gt", "$gte", "$eq"):
+                low = max(low, value)
+            if operator in ("$lt", "$lte", "$eq"):
+                high = min(high, value)
+
+        names = []
+        for name in self.partitions():
+            kind = self._kind(name)
+            if kind not in kinds:
+                continue
+            if kind == "company" and config.PARTITION_COMPANIES_BY_SECTOR and sectors:
+                if name[len(config.COMPANY_COLLECTION_NAME) + 1:] not in sectors:
+                    continue
+            if kind == "news" and (low > float("-inf") or high < float("inf")):
+                covered = self.news_partition_range(name)
+                if covered is None:
+                    # Undated news sits at published_ts 0
+                    if not low <= 0 <= high:
+                        continue
+                elif covered[1] <= low or covered[0] > high:
+                    continue
+            names.append(name)
+        return names
+
+    # ------------------------------------------------------------------ API
+
+    def count(self) -> int:
+        return sum(collection.count() for collection in self.partitions().values())
+
+    def add(self, ids: List[str], documents: List[str] = None, metadatas: List[Dict] = None,
+            embeddings: List[List[float]] = None):
+        self._write("add", ids, documents, metadatas, embeddings)
+
+    def upsert(self, ids: List[str], documents: List[str] = None, metadatas: List[Dict] = None,
+               embeddings: List[List[float]] = None):
+        self._write("upsert", ids, documents, metadatas, embeddings)
+
+    def _write(self, method: str, ids, documents, metadatas, embeddings):
+        metadatas = metadatas or [{}] * len(ids)
+        groups = {}
+        for position, metadata in enumerate(metadatas):
+            groups.setdefault(self._partition_name(metadata), []).append(position)
+
+        # A document whose partition key changed (e.g. a new sector) must leave its old partition
+        if self._track_locations:
+            locations = self._location_map()
+            stale = {}
+            for name, positions in groups.items():
+                for i in positions:
+                    previous = locations.get(ids[i])
+                    if previous is not None and previous != name:
+                        stale.setdefault(previous, []).append(ids[i])
+            for name, stale_ids in stale.items():
+                self.partitions()[name].delete(ids=stale_ids)
+        else:
+            for name, positions in groups.items():
+                moved = [ids[i] for i in positions]
+                for other_name, other in self.partitions().items():
+                    if other_name != name and self._kind(other_name) == self._kind(name):
+                        stale_ids = other.get(ids=moved, include=[])["ids"]
+                        if stale_ids:
+                            other.delete(ids=stale_ids)
+
+        for name, positions in groups.items():
+            getattr(self._open(name), method)(
+                ids=[ids[i] for i in positions],
+                documents=[documents[i] for i in positions] if documents is not None else None,
+                metadatas=[metadatas[i] for i in positions],
+                embeddings=[embeddings[i] for i in positions] if embeddings is not None else None
+            )
+            if self._track_locations:
+                with self._lock:
+                    # A filtered delete may have dropped the map meanwhile; it is relisted then
+                    if self._locations is not None:
+                        self._locations.update((ids[i], name) for i in positions)
+
+    def get(self, ids: List[str] = None, where: Dict[str, Any] = None, limit: int = None,
+            offset: int = None, include: List[str] = ("metadatas", "documents")) -> Dict[str, Any]:
+        merged = {field: [] for field in ["ids", "metadatas", "documents", "embeddings"]}
+        skip = offset or 0
+
+        for name in self._route(where, ids):
+            if limit is not None and len(merged["ids"]) >= limit:
+                break
+            collection = self.partitions()[name]
+
+            if ids is None and where is None:
+                # Whole partitions can be skipped by count when paging without a filter
+                size = collection.count()
+                if skip >= size:
+                    skip -= size
+                    continue
+                page = collection.get(include=include, offset=skip,
+                                      limit=None if limit is None else limit - len(merged["ids"]))
+                skip = 0
+            else:
+                page = collection.get(ids=ids, where=where, include=include)
+                if skip:
+                    dropped = min(skip, len(page["ids"]))
+                    page = {field: (values[dropped:] if values is not None else None)
+                            for field, values in page.items() if field in merged}
+                    skip -= dropped
+                if limit is not None:
+                    remaining = limit - len(merged["ids"])
+                    page = {field: (values[:remaining] if values is not None else None)
+                            for field, values in page.items() if field in merged}
+
+            for field in merged:
+                if page.get(field) is not None:
+                    merged[field].extend(page[field])
+
+        return {field: (values if field == "ids" or field in include else None)
+                for field, values in merged.items()}
+
+    def query(self, query_embeddings: List[List[float]] = None, query_texts: List[str] = None,
+              n_results: int = 10, where: Dict[str, Any] = None,
+              include: List[str] = ("metadatas", "documents", "distances")) -> Dict[str, Any]:
+        """Query every allowed partition and merge the hits by distance"""
+        if query_embeddings is None:
+            query_embeddings = self.embedding_function(query_texts)
+        fields = set(include) | {"distances"}
+
+        rows = [[] for _ in query_embeddings]
+        for name in self._route(where):
+            collection = self.partitions()[name]
+            if collection.count() == 0:
+                continue
+            result = collection.query(query_embeddings=query_embeddings, n_results=n_results,
+                                      where=where, include=list(fields))
+            for row in range(len(query_embeddings)):
+                for i in range(len(result["ids"][row])):
+                    rows[row].append({field: result[field][row][i] for field in RESULT_FIELDS
+                                      if field == "ids" or (field in fields and result.get(field) is not None)})
+
+        merged = {field: [] for field in RESULT_FIELDS}
+        for hits in rows:
+            hits = sorted(hits, key=lambda hit: hit["distances"])[:n_results]
+            for field in RESULT_FIELDS:
+                merged[field].append([hit.get(field) for hit in hits])
+
+        return {field: (values if field == "ids" or field in include else None)
+                for field, values in merged.items()}
+
+    def delete(self, ids: List[str] = None, where: Dict[str, Any] = None):
+        for name in self._route(where, ids):
+            collection = self.partitions()[name]
+            if ids is None:
+                collection.delete(where=where)
+                with self._lock:
+                    self._locations = None  # Unknown which IDs went; relisted on the next write
+                continue
+            # Only touch partitions that actually hold some of the IDs
+            present = collection.get(ids=ids, where=where, include=[])["ids"]
+            if present:
+                collection.delete(ids=present)
+                with self._lock:
+                    if self._locations is not None:
+                        for doc_id in present:
+                            self._locations.pop(doc_id, None)
+
+    def drop_partition(self, name: str) -> int:
+        """Delete a whole partition collection, returning how many documents it held"""
+        with self._lock:
+            collection = self._partitions.pop(name, None)
+            if collection is not None and self._locations is not None:
+                self._locations = {doc_id: partition for doc_id, partition in self._locations.items()
+                                   if partition != name}
+        if collection is None:
+            return 0
+        count = collection.count()
+        self.client.delete_collection(name)
+        return count
+
+    def compact(self):
+        """Compact every partition whose backend supports it"""
+        for collection in self.partitions().values():
+            if hasattr(collection, "compact"):
+                collection.compact()
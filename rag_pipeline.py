@@ -1,13 +1,18 @@
 import os
-from typing import List, Dict, Any, Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterator
 from langchain.llms import OpenAI
 from langchain.chat_models import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage, BaseMessage
-from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
 import config
 import pandas as pd
 from vector_store import MSMEVectorStore
 from news_fetcher import NewsAggregator
+from answer_cache import SemanticAnswerCache, context_fingerprint
+
+# Blocking I/O (vector search, news APIs, caches) of async queries; threads start on demand
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=config.ASYNC_IO_WORKERS, thread_name_prefix="rag-io")
 
 class MSMERAGPipeline:
     def __init__(self):
@@ -18,32 +23,137 @@ class MSMERAGPipeline:
             model="gpt-3.5-turbo",
             temperature=0.7,
             openai_api_key=config.OPENAI_API_KEY,
-            streaming=True,
-            callbacks=[StreamingStdOutCallbackHandler()]
+            streaming=True
         )
 
         self.vector_store = MSMEVectorStore()
         self.news_aggregator = NewsAggregator()
         self.conversation_history = []
 
+        self.answer_cache = None
+        if config.ANSWER_CACHE_ENABLED:
+            self.answer_cache = SemanticAnswerCache(
+                config.ANSWER_CACHE_PATH,
+                similarity_threshold=config.ANSWER_CACHE_SIMILARITY,
+                ttl_seconds=config.ANSWER_CACHE_TTL_SECONDS,
+                max_entries=config.ANSWER_CACHE_MAX_ENTRIES,
+                namespace=f"{self.llm.model_name}:{self.vector_store.embedder.name}"
+            )
+
     def initialize_knowledge_base(self, companies_file: str, financial_file: str):
         print("Initializing knowledge base...")
+
+        # A fresh node loads the pre-built snapshot instead of re-embedding everything
+        if config.SNAPSHOT_PATH and os.path.exists(config.SNAPSHOT_PATH) and self.vector_store.collection.count() == 0:
+            try:
+                self.vector_store.import_snapshot(config.SNAPSHOT_PATH)
+            except Exception as e:
+                print(f"Warning: Could not import snapshot - {str(e)}")
+
         self.vector_store.load_company_data(companies_file, financial_file)
 
         try:
             print("Fetching recent news...")
             recent_news = self.news_aggregator.fetch_all_news(limit=30)
             if recent_news:
-                self.vector_store.add_news_articles(recent_news)
-                print(f"Added {len(recent_news)} news articles")
+                news_stats = self.vector_store.add_news_articles(recent_news)
+                print(f"Added {news_stats['written']} news articles "
+                      f"({news_stats['skipped']} already indexed, "
+                      f"{news_stats['near_duplicates']} near-duplicates)")
             else:
                 print("No news articles fetched (API keys may be missing)")
         except Exception as e:
             print(f"Warning: Could not fetch news - {str(e)}")
 
+        # Retention is normally a scheduled job (see README); running it here slows every start
+        if config.NEWS_COMPACT_ON_STARTUP:
+            try:
+                self.vector_store.compact_news()
+            except Exception as e:
+                print(f"Warning: News compaction failed - {str(e)}")
+
         print("Knowledge base initialized!")
 
     def process_query(self, user_query: str, include_news: bool = True) -> str:
+        prepared = self._prepare_query(user_query, include_news)
+        if prepared["cached"] is not None:
+            self._update_conversation_history(user_query, prepared["cached"])
+            return prepared["cached"]
+
+        try:
+            response = self._generate_response(user_query, prepared["context"], prepared["analysis"])
+        except Exception as e:
+            response = self._error_response(e)
+        else:
+            self._cache_answer(user_query, prepared, response)
+        self._update_conversation_history(user_query, response)
+
+        return response
+
+    def process_query_stream(self, user_query: str, include_news: bool = True) -> Iterator[str]:
+        """Like process_query, but yields the answer in chunks as the LLM produces them"""
+        prepared = self._prepare_query(user_query, include_news)
+        if prepared["cached"] is not None:
+            self._update_conversation_history(user_query, prepared["cached"])
+            yield prepared["cached"]
+            return
+
+        parts = []
+        failed = False
+        try:
+            for chunk in self.llm.stream(self._build_messages(user_query, prepared["context"], prepared["analysis"])):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+        except Exception as e:
+            failed = True
+            message = ("\n\n" if parts else "") + self._error_response(e)
+            parts.append(message)
+            yield message
+
+        response = "".join(parts)
+        if not failed:
+            self._cache_answer(user_query, prepared, response)
+        self._update_conversation_history(user_query, response)
+
+    async def process_query_async(self, user_query: str, include_news: bool = True) -> str:
+        """
+        Like process_query, but retrieval and the live news lookup run concurrently in
+        worker threads and the LLM call is awaited, so one event loop can serve many queries
+        """
+        query_analysis = self._analyze_query(user_query)
+
+        retrieval = self._run_blocking(self._retrieve_context, user_query, query_analysis)
+        if include_news and self._should_include_news(query_analysis):
+            news_lookup = self._run_blocking(self._get_relevant_news, query_analysis)
+        else:
+            news_lookup = asyncio.sleep(0, result=[])
+        context_docs, news_context = await asyncio.gather(retrieval, news_lookup)
+
+        prepared = await self._run_blocking(
+            self._with_cached_answer, user_query, self._assemble_context(query_analysis, context_docs, news_context)
+        )
+        if prepared["cached"] is not None:
+            self._update_conversation_history(user_query, prepared["cached"])
+            return prepared["cached"]
+
+        try:
+            message = await self.llm.ainvoke(self._build_messages(user_query, prepared["context"], query_analysis))
+            response = message.content
+        except Exception as e:
+            response = self._error_response(e)
+        else:
+            await self._run_blocking(self._cache_answer, user_query, prepared, response)
+        self._update_conversation_history(user_query, response)
+
+        return response
+
+    async def _run_blocking(self, function, *args):
+        # asyncio's default executor has only cpu_count + 4 threads, too few for I/O-bound work
+        return await asyncio.get_running_loop().run_in_executor(_IO_EXECUTOR, function, *args)
+
+    def _prepare_query(self, user_query: str, include_news: bool) -> Dict[str, Any]:
+        """Everything that happens before the LLM call: analysis, retrieval, context and cache lookup"""
         query_analysis = self._analyze_query(user_query)
         context_docs = self._retrieve_context(user_query, query_analysis)
 
@@ -51,11 +161,37 @@ class MSMERAGPipeline:
         if include_news and self._should_include_news(query_analysis):
             news_context = self._get_relevant_news(query_analysis)
 
-        full_context = self._build_context(context_docs, news_context)
-        response = self._generate_response(user_query, full_context, query_analysis)
-        self._update_conversation_history(user_query, response)
+        return self._with_cached_answer(user_query, self._assemble_context(query_analysis, context_docs, news_context))
 
-        return response
+    def _assemble_context(self, query_analysis: Dict[str, Any], context_docs: List[Dict],
+                          news_context: List[Dict]) -> Dict[str, Any]:
+        return {
+            "analysis": query_analysis,
+            "context_docs": context_docs,
+            "news_context": news_context,
+            "context": self._build_context(context_docs, news_context)
+        }
+
+    def _with_cached_answer(self, user_query: str, prepared: Dict[str, Any]) -> Dict[str, Any]:
+        # Same question (by embedding) over the same retrieved context and conversation reuses the
+        # earlier answer; any change to those documents, the news or the history changes the fingerprint
+        prepared["cached"] = None
+        prepared["cache_key"] = None
+        if self.answer_cache is not None:
+            query_embedding = self.vector_store.embedding_function([user_query])[0]
+            fingerprint = context_fingerprint(prepared["context_docs"], prepared["news_context"],
+                                              extra=[prepared["analysis"]["query_type"], self._history_text()])
+            prepared["cache_key"] = (query_embedding, fingerprint)
+            prepared["cached"] = self.answer_cache.get(query_embedding, fingerprint)
+        return prepared
+
+    def _cache_answer(self, user_query: str, prepared: Dict[str, Any], response: str):
+        # Only real answers are cached, never the error message
+        if prepared["cache_key"] is not None:
+            self.answer_cache.put(user_query, prepared["cache_key"][0], prepared["cache_key"][1], response)
+
+    def _error_response(self, error: Exception) -> str:
+        return f"I apologize, but I encountered an error while processing your request: {str(error)}. Please try rephrasing your question."
 
     def _analyze_query(self, query: str) -> Dict[str, Any]:
         query_lower = query.lower()
@@ -97,22 +233,23 @@ class MSMERAGPipeline:
         return analysis
 
     def _retrieve_context(self, query: str, analysis: Dict[str, Any]) -> List[Dict]:
-        context_docs = []
-
-        base_results = self.vector_store.search_similar(query, n_results=8)
-        context_docs.extend(base_results)
+        # All searches go out as one batch: the query is embedded once
+        search_requests = [{"query": query, "n_results": 8}]
 
         for sector in analysis["sectors"]:
-            sector_results = self.vector_store.search_by_sector(query, sector, n_results=5)
-            context_docs.extend(sector_results)
+            search_requests.append({"query": query, "filter": {"sector": sector}, "n_results": 5})
 
         if analysis["needs_financial"] or analysis["query_type"] == "financial_analysis":
-            financial_results = self.vector_store.search_similar(
-                f"{query} financial performance metrics",
-                n_results=5,
-                filter_dict={"type": "company"}
-            )
-            context_docs.extend(financial_results)
+            search_requests.append({
+                "query": f"{query} financial performance metrics",
+                "filter": {"type": "company"},
+                "n_results": 5
+            })
+
+        context_docs = []
+        for results in self.vector_store.search_batch(search_requests, hybrid=config.HYBRID_SEARCH,
+                                                      include_embeddings=True):
+            context_docs.extend(results)
 
         seen_ids = set()
         unique_docs = []
@@ -121,7 +258,9 @@ class MSMERAGPipeline:
                 seen_ids.add(doc["id"])
                 unique_docs.append(doc)
 
-        return unique_docs[:15]
+        # Overlapping result lists repeat near-identical documents; keep a relevant but diverse set
+        return self.vector_store.rerank_mmr(query, unique_docs, k=config.MMR_CONTEXT_DOCS,
+                                            lambda_mult=config.MMR_LAMBDA)
 
     def _should_include_news(self, analysis: Dict[str, Any]) -> bool:
         return (analysis["needs_news"] or 
@@ -131,12 +270,23 @@ class MSMERAGPipeline:
     def _get_relevant_news(self, analysis: Dict[str, Any]) -> List[Dict]:
         news_articles = []
 
-        for sector in analysis["sectors"]:
+        if len(analysis["sectors"]) == 1:
+            # Keyword-targeted provider queries find more for a single sector
+            sector = analysis["sectors"][0]
             try:
-                sector_news = self.news_aggregator.fetch_sector_news(sector, limit=5)
-                news_articles.extend(sector_news)
+                news_articles.extend(self.news_aggregator.fetch_sector_news(sector, limit=5))
             except Exception as e:
                 print(f"Could not fetch news for {sector}: {str(e)}")
+        elif analysis["sectors"]:
+            try:
+                # One call per provider covers every sector in the query
+                sector_news = self.news_aggregator.fetch_all_sectors(limit=5, sectors=analysis["sectors"])
+                for sector in analysis["sectors"]:
+                    # An article can match several of the query's sectors
+                    news_articles.extend(article for article in sector_news.get(sector, [])
+                                         if article not in news_articles)
+            except Exception as e:
+                print(f"Could not fetch sector news: {str(e)}")
 
         if not analysis["sectors"]:
             try:
@@ -174,6 +324,10 @@ class MSMERAGPipeline:
         return "\n".join(context_parts)
 
     def _generate_response(self, query: str, context: str, analysis: Dict[str, Any]) -> str:
+        response = self.llm(self._build_messages(query, context, analysis))
+        return response.content
+
+    def _build_messages(self, query: str, context: str, analysis: Dict[str, Any]) -> List[BaseMessage]:
         system_prompt = self._build_system_prompt(analysis)
 
         user_prompt = f"""Based on the following context about MSME companies, financial data, and market news, please answer the user's question comprehensively.
@@ -197,17 +351,17 @@ Response:"""
             HumanMessage(content=user_prompt)
         ]
 
-        if self.conversation_history:
-            recent_history = self.conversation_history[-4:]
-            history_text = "\n".join([f"User: {h['user']}\nAssistant: {h['assistant'][:200]}..." 
-                                     for h in recent_history])
+        history_text = self._history_text()
+        if history_text:
             messages.insert(1, HumanMessage(content=f"Previous conversation context:\n{history_text}"))
 
-        try:
-            response = self.llm(messages)
-            return response.content
-        except Exception as e:
-            return f"I apologize, but I encountered an error while processing your request: {str(e)}. Please try rephrasing your question."
+        return messages
+
+    def _history_text(self) -> str:
+        """The recent turns _build_messages puts in front of the question (empty without history)"""
+        recent_history = self.conversation_history[-4:]
+        return "\n".join([f"User: {h['user']}\nAssistant: {h['assistant'][:200]}..."
+                          for h in recent_history])
 
     def _build_system_prompt(self, analysis: Dict[str, Any]) -> str:
         base_prompt = """You are an expert MSME (Micro, Small, and Medium Enterprise) market intelligence analyst with deep knowledge of Indian business markets, financial analysis, and industry trends. You specialize in providing actionable insights for MSME companies across Manufacturing, Food Processing, Technology, Healthcare, and Textiles sectors."""
@@ -238,8 +392,13 @@ Response:"""
             self.conversation_history = self.conversation_history[-10:]
 
     def get_sector_summary(self, sector: str) -> str:
-        query = f"Provide a comprehensive overview of {sector} sector companies, their performance, and market trends"
-        return self.process_query(query, include_news=True)
+        return self.process_query(self._sector_summary_query(sector), include_news=True)
+
+    def get_sector_summary_stream(self, sector: str) -> Iterator[str]:
+        return self.process_query_stream(self._sector_summary_query(sector), include_news=True)
+
+    def _sector_summary_query(self, sector: str) -> str:
+        return f"Provide a comprehensive overview of {sector} sector companies, their performance, and market trends"
 
     def get_company_analysis(self, company_name: str) -> str:
         query = f"Provide detailed analysis of {company_name} including financial performance, market position, and recent developments"
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+
+class RateLimiter:
+    """
+    Per-provider request budgets: a token bucket refilled continuously for per-minute
+    limits and a counter that resets at UTC midnight for per-day quotas. State is
+    shared by every thread and saved to disk so restarts do not reset the quotas.
+    """
+
+    def __init__(self, limits: Dict[str, Dict[str, Optional[int]]], path: str = None):
+        self.limits = limits
+        self.path = path
+        self.waited_seconds = 0.0
+        self.denied = 0
+        self._lock = threading.Lock()
+        self._state = {}
+
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError):
+                self._state = {}
+
+    def _today(self) -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _bucket(self, provider: str, now: float) -> Dict[str, Any]:
+        """Provider state with the minute bucket refilled and the day counter rolled over"""
+        limits = self.limits.get(provider, {})
+        per_minute = limits.get("per_minute")
+        state = self._state.setdefault(provider, {
+            "tokens": float(per_minute or 0), "updated": now, "day": self._today(), "day_count": 0
+        })
+
+        if per_minute:
+            elapsed = max(0.0, now - state["updated"])
+            state["tokens"] = min(float(per_minute), state["tokens"] + elapsed * per_minute / 60.0)
+        state["updated"] = now
+
+        if state["day"] != self._today():
+            state["day"] = self._today()
+            state["day_count"] = 0
+        return state
+
+    def acquire(self, provider: str, max_wait: float = None, count_daily: bool = True) -> bool:
+        """
+        Take one request from the provider's budget, sleeping at most `max_wait` seconds
+        for the minute bucket to refill. Returns False when the daily quota is spent or
+        the wait would be longer; the request should then be skipped. Retries of a
+        request already charged pass `count_daily=False` and only draw a minute token.
+        """
+        limits = self.limits.get(provider, {})
+        per_minute = limits.get("per_minute")
+        per_day = limits.get("per_day")
+        deadline = time.monotonic() + max_wait if max_wait is not None else None
+
+        while True:
+            with self._lock:
+                state = self._bucket(provider, time.time())
+                if count_daily and per_day and state["day_count"] >= per_day:
+                    # A daily quota never refills in time to be worth waiting for
+                    self.denied += 1
+                    return False
+                if not per_minute or state["tokens"] >= 1.0:
+                    if per_minute:
+                        state["tokens"] -= 1.0
+                    if count_daily:
+                        state["day_count"] += 1
+                    self._save()
+                    return True
+                wait = (1.0 - state["tokens"]) * 60.0 / per_minute
+
+            if deadline is not None and time.monotonic() + wait > deadline:
+                with self._lock:
+                    self.denied += 1
+                return False
+            time.sleep(wait)
+            with self._lock:
+                self.waited_seconds += wait
+
+    def remaining(self, provider: str) -> Dict[str, Optional[float]]:
+        """Requests available right now this minute and left today (None where unlimited)"""
+        limits = self.limits.get(provider, {})
+        with self._lock:
+            state = self._bucket(provider, time.time())
+            return {
+                "minute": state["tokens"] if limits.get("per_minute") else None,
+                "day": limits["per_day"] - state["day_count"] if limits.get("per_day") else None
+            }
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._state, f)
+        os.replace(tmp_path, self.path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "remaining": {provider: self.remaining(provider) for provider in self.limits},
+            "waited_seconds": self.waited_seconds,
+            "denied": self.denied
+        }
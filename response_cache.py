@@ -0,0 +1,102 @@
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+from typing import Dict, Any, Optional, Iterable
+
+
+class ResponseCache:
+    """
+    On-disk SQLite cache of provider HTTP responses keyed by provider, URL and
+    parameters, keeping ETag/Last-Modified validators for conditional refreshes
+    """
+
+    def __init__(self, path: str, secret_params: Iterable[str] = (), retention_seconds: float = 86400):
+        self.path = path
+        self.secret_params = set(secret_params)
+        self.retention_seconds = retention_seconds
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.bytes_saved = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " provider TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def key(self, provider: str, url: str, params: Dict[str, Any]) -> str:
+        # API keys are left out so rotating a key keeps the cache
+        public = {name: value for name, value in params.items() if name not in self.secret_params}
+        payload = json.dumps([provider, url, public], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached body, validators and age in seconds, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, fetched = row
+        return {"body": body, "etag": etag, "last_modified": last_modified, "age": time.time() - fetched}
+
+    def put(self, key: str, provider: str, body: bytes, etag: str = None, last_modified: str = None):
+        """Store a fresh response, dropping entries past the retention window"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, body, etag, last_modified, fetched) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, body, etag, last_modified, now)
+            )
+            self._conn.execute("DELETE FROM responses WHERE fetched < ?", (now - self.retention_seconds,))
+            self._conn.commit()
+
+    def touch(self, key: str):
+        """Mark a cached response fresh again after a 304 Not Modified"""
+        with self._lock:
+            self._conn.execute("UPDATE responses SET fetched = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def record(self, outcome: str, saved_bytes: int = 0):
+        """Count a "hit", "miss" or "revalidated" lookup"""
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "revalidated":
+                self.revalidated += 1
+            else:
+                self.misses += 1
+            self.bytes_saved += saved_bytes
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/revalidation counters, bytes not downloaded and current size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved
+        }
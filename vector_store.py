@@ -2,10 +2,102 @@ import chromadb
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Any
+import os
 import json
+import sqlite3
+import hashlib
 from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import config
-import uuid
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flat_store import FlatVectorClient
+from partitions import PartitionedCollection
+from embeddings import EmbeddingCache, CachedEmbeddingFunction, get_embedder
+from indexes import MetadataStatsIndex, RecencyIndex, CompanyColumnIndex, BM25Index, parse_timestamp
+from near_duplicates import NearDuplicateIndex, article_text
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Query parameters that only track the click and never change the article
+TRACKING_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+                   "fbclid", "gclid", "ref", "src"}
+
+
+def _content_hash(document: str, metadata: Dict[str, Any]) -> str:
+    """Stable hash of a document and its metadata, used to skip unchanged upserts"""
+    payload = json.dumps({"document": document, "metadata": metadata}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _canonical_url(url: str) -> str:
+    """Normalize an article URL so syndicated copies of the same link compare equal"""
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k.lower() not in TRACKING_PARAMS]
+    return urlunsplit((
+        parts.scheme.lower() or "https",
+        parts.netloc.lower().removeprefix("www."),
+        parts.path.rstrip("/"),
+        urlencode(sorted(query)),
+        ""
+    ))
+
+
+def _news_dedup_text(metadata: Dict[str, Any]) -> str:
+    """Text compared by near-duplicate checks, stored with each article at ingest"""
+    # Articles indexed before it was stored fall back to their (truncated) title
+    return metadata.get("dedup_text") or article_text({"title": metadata.get("title", "")})
+
+
+def _published_ts(metadata: Dict[str, Any]) -> float:
+    return metadata.get("published_ts") or parse_timestamp(metadata.get("published_at")) or 0.0
+
+
+def _shares_server() -> bool:
+    """Whether other worker processes may be writing to the same collection (Chroma http mode)"""
+    return config.VECTOR_BACKEND == "chroma" and config.CHROMA_CLIENT_MODE == "http"
+
+
+def _news_id(article: Dict[str, Any]) -> str:
+    """Derive a stable ID from the canonical article URL, falling back to the title"""
+    if article.get("url"):
+        key = _canonical_url(article["url"])
+    else:
+        key = " ".join(article.get("title", "").lower().split())
+    return f"news_{hashlib.sha1(key.encode('utf-8')).hexdigest()}"
+
+
+class _SharedState:
+    """Backend client, collection, embedder and indexes shared by every store in the process"""
+
+    ATTRIBUTES = ("client", "embedder", "embedding_cache", "embedding_function", "collection",
+                  "query_executor", "stats_index", "recency_index", "company_index", "lexical_index",
+                  "news_duplicates", "write_lock")
+
+
+_SHARED_STATES = {}
+_SHARED_STATES_LOCK = threading.Lock()
+
+
+def _state_key() -> tuple:
+    if config.VECTOR_BACKEND == "flat":
+        location = os.path.abspath(config.FLAT_INDEX_DIRECTORY)
+    elif config.CHROMA_CLIENT_MODE == "http":
+        location = f"http://{config.CHROMA_HOST}:{config.CHROMA_PORT}"
+    else:
+        location = os.path.abspath(config.CHROMA_PERSIST_DIRECTORY)
+    return (config.VECTOR_BACKEND, location, config.COLLECTION_NAME,
+            config.PARTITIONED_LAYOUT, config.EMBEDDING_BACKEND)
+
+
+def reset_shared_stores():
+    """Forget the shared state so the next store reopens the backend (e.g. after config changes)"""
+    with _SHARED_STATES_LOCK:
+        for state in _SHARED_STATES.values():
+            state.query_executor.shutdown(wait=False)
+        _SHARED_STATES.clear()
+
 
 class MSMEVectorStore:
     """
@@ -13,65 +105,146 @@ class MSMEVectorStore:
     """
 
     def __init__(self):
-        self.client = chromadb.PersistentClient(path=config.CHROMA_PERSIST_DIRECTORY)
-        self.collection = self.client.get_or_create_collection(
-            name=config.COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine"}
+        # Client, collection, embedder and indexes are shared process-wide and opened on first use
+        self._state = None
+
+    def __getattr__(self, name: str):
+        if name in _SharedState.ATTRIBUTES:
+            return getattr(self._shared_state(), name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _shared_state(self) -> "_SharedState":
+        """Resolve (opening once per process) the state for the configured backend and collection"""
+        if self._state is None:
+            key = _state_key()
+            with _SHARED_STATES_LOCK:
+                state = _SHARED_STATES.get(key)
+                if state is None:
+                    state = _SharedState()
+                    self._state = state
+                    try:
+                        self._open_state(state)
+                    except Exception:
+                        self._state = None
+                        raise
+                    _SHARED_STATES[key] = state
+            self._state = state
+        return self._state
+
+    def _open_state(self, state: "_SharedState"):
+        state.client = self._create_client()
+        # Serializes read-hash/upsert/index-update sequences between every store sharing the state
+        state.write_lock = threading.RLock()
+
+        # Every document and query embedding goes through the on-disk cache
+        state.embedder = get_embedder()
+        state.embedding_cache = EmbeddingCache(
+            config.EMBEDDING_CACHE_PATH,
+            max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES,
+            namespace=state.embedder.name
         )
+        state.embedding_function = CachedEmbeddingFunction(state.embedder, state.embedding_cache)
+
+        if config.PARTITIONED_LAYOUT:
+            # Companies and monthly news live in separate collections behind a router
+            state.collection = PartitionedCollection(
+                state.client, state.embedding_function, collection_metadata={"hnsw:space": "cosine"}
+            )
+        else:
+            state.collection = state.client.get_or_create_collection(
+                name=config.COLLECTION_NAME,
+                metadata={"hnsw:space": "cosine"},
+                embedding_function=state.embedding_function
+            )
+        self._check_embedder(state)
+        state.query_executor = ThreadPoolExecutor(max_workers=config.SEARCH_BATCH_WORKERS)
+
+        if _shares_server():
+            # Other workers write to the same server, so in-process indexes would go stale.
+            # Stats, recency, structured filters and duplicate checks read the collection
+            # instead, and hybrid search falls back to vector-only ranking.
+            state.stats_index = state.recency_index = state.company_index = None
+            state.lexical_index = state.news_duplicates = None
+            return
+
+        # Exact counts maintained on every write; recounted once if out of sync
+        state.stats_index = MetadataStatsIndex(config.STATS_INDEX_PATH)
+        if state.stats_index.total != state.collection.count():
+            state.stats_index.rebuild(
+                metadata for page in self._iter_collection(include=["metadatas"])
+                for metadata in page["metadatas"]
+            )
+
+        # In-memory secondary indexes, rebuilt from the collection metadata on startup
+        state.recency_index = RecencyIndex()
+        state.company_index = CompanyColumnIndex()
+        state.lexical_index = BM25Index(k1=config.BM25_K1, b=config.BM25_B)
+        state.news_duplicates = NearDuplicateIndex()
+        for page in self._iter_collection(include=["documents", "metadatas"]):
+            self._index_documents(added=dict(zip(page["ids"], page["metadatas"])), removed={},
+                                  documents=dict(zip(page["ids"], page["documents"])))
+
+    def _check_embedder(self, state: "_SharedState"):
+        """Refuse to open a collection whose stored vectors come from a different embedder"""
+        sample = state.collection.get(limit=1, include=["metadatas", "embeddings"])
+        if not sample["ids"]:
+            return
 
-    def load_company_data(self, companies_file: str, financial_file: str):
+        # Documents written before the embedder was recorded are only checked by dimension
+        stored_name = (sample["metadatas"][0] or {}).get("embedder")
+        stored_dimensions = len(sample["embeddings"][0])
+        dimensions = len(state.embedding_function(["dimension probe"])[0])
+        if stored_dimensions != dimensions or (stored_name and stored_name != state.embedder.name):
+            raise ValueError(
+                f"The vector store holds {stored_dimensions}-dimensional vectors from embedder "
+                f"'{stored_name or 'unknown'}', but EMBEDDING_BACKEND gives '{state.embedder.name}' "
+                f"({dimensions} dimensions). Switch the embedding backend back, or delete the "
+                f"store and reload the data to re-embed it."
+            )
+
+    def _create_client(self):
+        """Open the vector backend selected in config.VECTOR_BACKEND"""
+        if config.VECTOR_BACKEND == "flat":
+            return FlatVectorClient(config.FLAT_INDEX_DIRECTORY, quantization=config.FLAT_QUANTIZATION)
+        if config.VECTOR_BACKEND == "chroma":
+            if config.CHROMA_CLIENT_MODE == "http":
+                # One HTTP session per process, reused by every store through the shared state
+                return chromadb.HttpClient(host=config.CHROMA_HOST, port=str(config.CHROMA_PORT))
+            if config.CHROMA_CLIENT_MODE == "embedded":
+                return chromadb.PersistentClient(path=config.CHROMA_PERSIST_DIRECTORY)
+            raise ValueError(f"Unknown Chroma client mode '{config.CHROMA_CLIENT_MODE}'. Choose 'embedded' or 'http'")
+        raise ValueError(f"Unknown vector backend '{config.VECTOR_BACKEND}'. Choose 'chroma' or 'flat'")
+
+    def load_company_data(self, companies_file: str, financial_file: str,
+                          batch_size: int = None) -> Dict[str, Any]:
         """Load MSME company and financial data into vector store"""
         # Load datasets
         companies_df = pd.read_csv(companies_file)
         financial_df = pd.read_csv(financial_file)
 
-        # Prepare documents for embedding
-        documents = []
-        metadatas = []
-        ids = []
+        return self.load_company_frames(companies_df, financial_df, batch_size=batch_size)
 
+    def load_company_frames(self, companies_df: pd.DataFrame, financial_df: pd.DataFrame,
+                            batch_size: int = None) -> Dict[str, Any]:
+        """Bulk-load company and financial frames in bounded batches"""
         print(f"Loading {len(companies_df)} companies into vector store...")
 
-        for _, company in companies_df.iterrows():
-            company_id = company['Company_ID']
-
-            # Get financial data for this company
-            company_financials = financial_df[financial_df['Company_ID'] == company_id]
-
-            # Create comprehensive document text
-            doc_text = self._create_company_document(company, company_financials)
-
-            # Create metadata
-            metadata = {
-                "type": "company",
-                "company_id": company_id,
-                "company_name": company['Company_Name'],
-                "sector": company['Sector'],
-                "location": company['Location'],
-                "founded_year": int(company['Founded_Year']),
-                "employee_count": int(company['Employee_Count']),
-                "credit_rating": str(company.get('Credit_Rating', 'N/A')),
-                "risk_level": str(company.get('Risk_Level', 'N/A')),
-                "market_outlook": str(company.get('Market_Outlook', 'N/A'))
-            }
+        # Documents and metadata are built column-wise, financials are grouped once
+        documents = self._create_company_documents(companies_df, financial_df)
+        metadatas = self._create_company_metadatas(companies_df)
+        ids = ("company_" + companies_df['Company_ID'].astype(str)).tolist()
 
-            documents.append(doc_text)
-            metadatas.append(metadata)
-            ids.append(f"company_{company_id}")
+        stats = self._upsert_in_batches(documents, metadatas, ids, batch_size, label="companies")
 
-        # Add to collection
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        print(f"Successfully loaded {stats['documents']} company records "
+              f"({stats['written']} written, {stats['skipped']} unchanged, "
+              f"{stats['docs_per_sec']:.1f} docs/sec)!")
+        return stats
 
-        print(f"Successfully loaded {len(documents)} company records!")
-
-    def add_news_articles(self, articles: List[Dict[str, Any]]):
+    def add_news_articles(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Add news articles to the vector store"""
         if not articles:
-            return
+            return {"documents": 0, "written": 0, "skipped": 0, "near_duplicates": 0}
 
         documents = []
         metadatas = []
@@ -79,38 +252,394 @@ class MSMEVectorStore:
 
         print(f"Adding {len(articles)} news articles to vector store...")
 
+        # Held from the near-duplicate check to the upsert, so concurrent batches cannot both index a story
+        with self.write_lock:
+            articles, near_duplicates = self._drop_near_duplicates(articles)
+
+            for article in articles:
+                # Create document text from article
+                doc_text = self._create_news_document(article)
+
+                # Create metadata
+                metadata = {
+                    "type": "news",
+                    "source": article.get("source", ""),
+                    "title": article.get("title", "")[:100],  # Truncate long titles
+                    "category": article.get("category", "business"),
+                    "published_at": article.get("published_at", ""),
+                    # Numeric epoch for range scans; 0.0 when the provider date is unparseable
+                    "published_ts": parse_timestamp(article.get("published_at")) or 0.0,
+                    "url": article.get("url", ""),
+                    "source_name": article.get("source_name", ""),
+                    # Full title + description for near-duplicate checks
+                    "dedup_text": article_text(article)
+                }
+
+                # Add sentiment if available
+                if "sentiment" in article:
+                    metadata["sentiment"] = article["sentiment"]
+                    metadata["sentiment_score"] = float(article.get("sentiment_score", 0.0))
+
+                documents.append(doc_text)
+                metadatas.append(metadata)
+                ids.append(_news_id(article))
+
+            # Upsert so re-fetched articles overwrite rather than duplicate
+            stats = self._upsert_in_batches(documents, metadatas, ids, label="news")
+        stats["near_duplicates"] = near_duplicates
+
+        print(f"Successfully added {stats['written']} news articles "
+              f"({stats['skipped']} unchanged, {near_duplicates} near-duplicates dropped)!")
+        return stats
+
+    def _drop_near_duplicates(self, articles: List[Dict[str, Any]]) -> tuple:
+        """Drop articles that restate an indexed story or an earlier article in the same batch"""
+        if not config.NEAR_DUPLICATE_THRESHOLD:
+            return articles, 0
+
+        stored = self._current_news_duplicates()
+        batch = NearDuplicateIndex()
+        kept = []
         for article in articles:
-            # Create document text from article
-            doc_text = self._create_news_document(article)
-
-            # Create metadata
-            metadata = {
-                "type": "news",
-                "source": article.get("source", ""),
-                "title": article.get("title", "")[:100],  # Truncate long titles
-                "category": article.get("category", "business"),
-                "published_at": article.get("published_at", ""),
-                "url": article.get("url", ""),
-                "source_name": article.get("source_name", "")
-            }
-
-            # Add sentiment if available
-            if "sentiment" in article:
-                metadata["sentiment"] = article["sentiment"]
-                metadata["sentiment_score"] = float(article.get("sentiment_score", 0.0))
-
-            documents.append(doc_text)
-            metadatas.append(metadata)
-            ids.append(f"news_{uuid.uuid4().hex}")
-
-        # Add to collection
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
+            text = article_text(article)
+            if not text.strip():
+                kept.append(article)
+                continue
+            doc_id = _news_id(article)
+            signature = batch.signature(text)
+            # The article's own stored copy is a re-fetch, not a duplicate; upsert handles it
+            if (stored.find(signature=signature, exclude=doc_id)
+                    or batch.find(signature=signature, exclude=doc_id)):
+                continue
+            batch.add(doc_id, signature=signature)
+            kept.append(article)
+        return kept, len(articles) - len(kept)
+
+    def _upsert_in_batches(self, documents: List[str], metadatas: List[Dict], ids: List[str],
+                           batch_size: int = None, label: str = "documents",
+                           embeddings: List[List[float]] = None) -> Dict[str, Any]:
+        """
+        Upsert documents in bounded batches, skipping ones whose content is unchanged.
+        Precomputed `embeddings` are stored as-is instead of calling the embedder.
+        """
+        batch_size = batch_size or config.INGEST_BATCH_SIZE
+        # Chroma rejects batches larger than its own limit
+        batch_size = min(batch_size, getattr(self.client, "max_batch_size", batch_size))
+
+        # Later duplicates of an ID win, as they would with sequential upserts
+        records = {}
+        vectors = {}
+        for position, (doc_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
+            # A stored hash (e.g. from a snapshot) must not feed into the new one
+            metadata = {key: value for key, value in metadata.items() if key not in ("content_hash", "embedder")}
+            # The embedder is part of the hash, so switching models re-embeds every document
+            metadata["embedder"] = self.embedder.name
+            metadata["content_hash"] = _content_hash(document, metadata)
+            records[doc_id] = (document, metadata)
+            if embeddings is not None:
+                vectors[doc_id] = embeddings[position]
+        ids = list(records)
+
+        total = len(ids)
+        written = 0
+        start = time.perf_counter()
+
+        for offset in range(0, total, batch_size):
+            batch_ids = ids[offset:offset + batch_size]
+
+            # The stored hashes must not change between reading them and recording the write
+            with self.write_lock:
+                # Only documents that are new or whose content hash changed get embedded
+                existing = self.collection.get(ids=batch_ids, include=["metadatas"])
+                stored = {doc_id: metadata or {}
+                          for doc_id, metadata in zip(existing["ids"], existing["metadatas"])}
+                changed = [doc_id for doc_id in batch_ids
+                           if stored.get(doc_id, {}).get("content_hash") != records[doc_id][1]["content_hash"]]
+
+                if changed:
+                    self.collection.upsert(
+                        documents=[records[doc_id][0] for doc_id in changed],
+                        metadatas=[records[doc_id][1] for doc_id in changed],
+                        embeddings=[vectors[doc_id] for doc_id in changed] if vectors else None,
+                        ids=changed
+                    )
+                    self._record_write(
+                        added={doc_id: records[doc_id][1] for doc_id in changed},
+                        removed={doc_id: stored[doc_id] for doc_id in changed if doc_id in stored},
+                        documents={doc_id: records[doc_id][0] for doc_id in changed}
+                    )
+                    written += len(changed)
+
+            done = offset + len(batch_ids)
+            elapsed = time.perf_counter() - start
+            print(f"  {label}: {done}/{total} ({done / elapsed if elapsed else 0.0:.1f} docs/sec, "
+                  f"{done - written} unchanged)")
+
+        elapsed = time.perf_counter() - start
+        return {
+            "documents": total,
+            "written": written,
+            "skipped": total - written,
+            "seconds": elapsed,
+            "docs_per_sec": total / elapsed if elapsed else 0.0
+        }
+
+    def delete_documents(self, ids: List[str]) -> int:
+        """Delete documents by ID, keeping the stats index in sync"""
+        if not ids:
+            return 0
+
+        with self.write_lock:
+            existing = self.collection.get(ids=list(ids), include=["metadatas"])
+            if not existing["ids"]:
+                return 0
+
+            self.collection.delete(ids=existing["ids"])
+            self._record_write(added={}, removed=dict(zip(existing["ids"], existing["metadatas"])))
+            return len(existing["ids"])
+
+    def export_snapshot(self, path: str) -> Dict[str, Any]:
+        """Write IDs, documents, metadata and embeddings to a single compressed .npz file"""
+        ids, documents, metadatas, embeddings = [], [], [], []
+        for page in self._iter_collection(include=["documents", "metadatas", "embeddings"]):
+            ids.extend(page["ids"])
+            documents.extend(page["documents"])
+            metadatas.extend(page["metadatas"])
+            embeddings.extend(page["embeddings"])
+        if not ids:
+            raise ValueError("Nothing to export: the vector store is empty")
+
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "embedder": self.embedder.name,
+            "count": len(ids),
+            "created_at": datetime.now().isoformat()
+        }
+        # Text goes in as one JSON blob so loading never needs allow_pickle
+        records = json.dumps({"ids": ids, "documents": documents, "metadatas": metadatas})
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        np.savez_compressed(
+            path,
+            manifest=np.frombuffer(json.dumps(manifest).encode("utf-8"), dtype=np.uint8),
+            records=np.frombuffer(records.encode("utf-8"), dtype=np.uint8),
+            embeddings=vectors.reshape(len(ids), -1)
         )
 
-        print(f"Successfully added {len(documents)} news articles!")
+        print(f"Exported {len(ids)} documents to {path}")
+        return manifest
+
+    def import_snapshot(self, path: str, batch_size: int = None) -> Dict[str, Any]:
+        """Load a snapshot written by export_snapshot without calling the embedder"""
+        start = time.perf_counter()
+        with np.load(path) as snapshot:
+            manifest = json.loads(snapshot["manifest"].tobytes().decode("utf-8"))
+            records = json.loads(snapshot["records"].tobytes().decode("utf-8"))
+            embeddings = snapshot["embeddings"]
+
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format: {manifest.get('format_version')}")
+        # Queries are embedded with the configured model, so stored vectors must come from the same one
+        if manifest.get("embedder") != self.embedder.name:
+            raise ValueError(f"Snapshot was built with embedder '{manifest.get('embedder')}', "
+                             f"but the store is configured for '{self.embedder.name}'")
+
+        print(f"Importing {manifest['count']} documents from {path}...")
+        stats = self._upsert_in_batches(records["documents"], records["metadatas"], records["ids"],
+                                        batch_size=batch_size, label="snapshot",
+                                        embeddings=embeddings.tolist())
+        stats["seconds"] = time.perf_counter() - start
+        print(f"Imported snapshot in {stats['seconds']:.2f}s ({stats['written']} written)")
+        return stats
+
+    def compact_news(self, max_age_days: float = None, max_per_source: int = None) -> Dict[str, Any]:
+        """
+        Enforce the news retention policy: delete articles older than `max_age_days`
+        and the oldest articles beyond `max_per_source` per source. Disk space is
+        reclaimed only once at least config.NEWS_COMPACT_RECLAIM_MIN_DELETED vectors
+        were freed, since that rewrites the whole database file.
+        """
+        # Writers wait for the whole job, so nothing is added between selecting and deleting
+        with self.write_lock:
+            max_age_days = config.NEWS_MAX_AGE_DAYS if max_age_days is None else max_age_days
+            max_per_source = config.NEWS_MAX_PER_SOURCE if max_per_source is None else max_per_source
+            bytes_before = self._storage_bytes()
+            cutoff = time.time() - max_age_days * 86400 if max_age_days else None
+
+            entries = self._current_recency_index().entries()
+            # Undated articles (published_ts 0) only count against the per-source cap
+            expired = {doc_id for doc_id, (published_ts, _, _) in entries.items()
+                       if cutoff is not None and 0 < published_ts < cutoff}
+            expired_count = len(expired)
+
+            over_quota = set()
+            if max_per_source:
+                by_source = {}
+                for doc_id, (published_ts, _, source) in entries.items():
+                    if doc_id not in expired:
+                        by_source.setdefault(source, []).append((published_ts, doc_id))
+                for articles in by_source.values():
+                    articles.sort(reverse=True)
+                    over_quota.update(doc_id for _, doc_id in articles[max_per_source:])
+
+            # Whole monthly partitions past the cutoff are dropped rather than deleted row by row
+            partitions_dropped = []
+            dropped_count = 0
+            if isinstance(self.collection, PartitionedCollection) and cutoff is not None:
+                for name, partition in self.collection.partitions("news").items():
+                    covered = self.collection.news_partition_range(name)
+                    if covered and covered[1] <= cutoff:
+                        dropped = {}
+                        for page in self._iter_pages(partition, include=["metadatas"]):
+                            dropped.update(zip(page["ids"], page["metadatas"]))
+                        self.collection.drop_partition(name)
+                        self._record_write(added={}, removed=dropped)
+                        expired -= dropped.keys()
+                        over_quota -= dropped.keys()
+                        partitions_dropped.append(name)
+                        dropped_count += len(dropped)
+
+            to_delete = list(expired | over_quota)
+            deleted = 0
+            for offset in range(0, len(to_delete), config.INGEST_BATCH_SIZE):
+                deleted += self.delete_documents(to_delete[offset:offset + config.INGEST_BATCH_SIZE])
+
+            freed = deleted + dropped_count
+            reclaimed = freed > 0 and freed >= (config.NEWS_COMPACT_RECLAIM_MIN_DELETED or 0)
+            if reclaimed:
+                self._reclaim_space()
+            bytes_after = self._storage_bytes()
+
+            report = {
+                "expired": expired_count,
+                "over_quota": len(over_quota),
+                "vectors_freed": freed,
+                "partitions_dropped": partitions_dropped,
+                "space_reclaimed": reclaimed,
+                "bytes_before": bytes_before,
+                "bytes_after": bytes_after,
+                "bytes_freed": bytes_before - bytes_after
+            }
+            print(f"News compaction: freed {report['vectors_freed']} vectors "
+                  f"and {report['bytes_freed'] / 1024:.1f} KB")
+            return report
+
+    def _reclaim_space(self):
+        """Give deleted vectors' space back to the filesystem where the backend allows it"""
+        if hasattr(self.collection, "compact"):
+            self.collection.compact()
+
+        if config.VECTOR_BACKEND == "chroma" and config.CHROMA_CLIENT_MODE == "embedded":
+            # Chroma 0.4 has no vacuum API; its SQLite file only shrinks after VACUUM
+            sqlite_path = os.path.join(config.CHROMA_PERSIST_DIRECTORY, "chroma.sqlite3")
+            try:
+                with sqlite3.connect(sqlite_path, timeout=5) as conn:
+                    conn.execute("VACUUM")
+            except sqlite3.Error as e:
+                print(f"Warning: could not vacuum {sqlite_path} - {str(e)}")
+
+    def _storage_bytes(self) -> int:
+        """On-disk size of the vector backend"""
+        path = config.FLAT_INDEX_DIRECTORY if config.VECTOR_BACKEND == "flat" else config.CHROMA_PERSIST_DIRECTORY
+        total = 0
+        for root, _, files in os.walk(path):
+            for filename in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, filename))
+                except OSError:
+                    pass
+        return total
+
+    def _record_write(self, added: Dict[str, Dict], removed: Dict[str, Dict],
+                      documents: Dict[str, str] = None):
+        """Keep the persistent stats and every in-memory index in step with a write"""
+        if self.stats_index is None:
+            return
+        self.stats_index.update(added=list(added.values()), removed=list(removed.values()))
+        self._index_documents(added, removed, documents)
+
+    def _index_documents(self, added: Dict[str, Dict], removed: Dict[str, Dict],
+                         documents: Dict[str, str] = None):
+        """Apply added and removed documents to the in-memory secondary indexes"""
+        for doc_id in removed:
+            self.recency_index.remove(doc_id)
+            self.company_index.remove(doc_id)
+            self.lexical_index.remove(doc_id)
+            self.news_duplicates.remove(doc_id)
+
+        # The lexical index sees the same texts that get embedded
+        for doc_id, document in (documents or {}).items():
+            self.lexical_index.add(doc_id, document)
+
+        for doc_id, metadata in added.items():
+            if metadata.get("type") == "company":
+                self.company_index.upsert(doc_id, metadata)
+            elif metadata.get("type") == "news":
+                self.recency_index.add(doc_id, _published_ts(metadata),
+                                       metadata.get("category", ""), metadata.get("source", ""))
+                self.news_duplicates.add(doc_id, _news_dedup_text(metadata))
+
+    def _current_stats_index(self) -> MetadataStatsIndex:
+        """The stats index, or in http mode a recount of the server's current documents"""
+        if self.stats_index is not None:
+            return self.stats_index
+        index = MetadataStatsIndex(None)
+        index.rebuild(metadata for page in self._iter_collection(include=["metadatas"])
+                      for metadata in page["metadatas"])
+        return index
+
+    def _current_recency_index(self, since: float = None) -> RecencyIndex:
+        """The recency index, or in http mode one built from the server's news published since `since`"""
+        if self.recency_index is not None:
+            return self.recency_index
+        where = {"type": "news"}
+        if since is not None:
+            where = {"$and": [where, {"published_ts": {"$gte": since}}]}
+        index = RecencyIndex()
+        for page in self._iter_collection(include=["metadatas"], where=where):
+            for doc_id, metadata in zip(page["ids"], page["metadatas"]):
+                index.add(doc_id, _published_ts(metadata), metadata.get("category", ""), metadata.get("source", ""))
+        return index
+
+    def _current_company_index(self) -> CompanyColumnIndex:
+        """The company index, or in http mode one built from the server's current companies"""
+        if self.company_index is not None:
+            return self.company_index
+        index = CompanyColumnIndex()
+        for page in self._iter_collection(include=["metadatas"], where={"type": "company"}):
+            for doc_id, metadata in zip(page["ids"], page["metadatas"]):
+                index.upsert(doc_id, metadata)
+        return index
+
+    def _current_news_duplicates(self) -> NearDuplicateIndex:
+        """
+        The near-duplicate index, or in http mode one built from the server's news of the
+        last config.NEAR_DUPLICATE_WINDOW_DAYS, so each batch reads a bounded slice
+        """
+        if self.news_duplicates is not None:
+            return self.news_duplicates
+        where = {"type": "news"}
+        if config.NEAR_DUPLICATE_WINDOW_DAYS:
+            since = time.time() - config.NEAR_DUPLICATE_WINDOW_DAYS * 86400
+            where = {"$and": [where, {"published_ts": {"$gte": since}}]}
+        index = NearDuplicateIndex()
+        for page in self._iter_collection(include=["metadatas"], where=where):
+            for doc_id, metadata in zip(page["ids"], page["metadatas"]):
+                index.add(doc_id, _news_dedup_text(metadata))
+        return index
+
+    def _iter_collection(self, include: List[str], where: Dict = None, page_size: int = None):
+        """Page through the whole collection without loading it into memory at once"""
+        return self._iter_pages(self.collection, include, where, page_size)
+
+    def _iter_pages(self, collection, include: List[str], where: Dict = None, page_size: int = None):
+        page_size = page_size or config.INGEST_BATCH_SIZE
+        offset = 0
+        while True:
+            page = collection.get(include=include, where=where, limit=page_size, offset=offset)
+            if not page["ids"]:
+                break
+            yield page
+            offset += len(page["ids"])
 
     def search_similar(self, query: str, n_results: int = 10, filter_dict: Dict = None) -> List[Dict]:
         """Search for similar content in the vector store"""
@@ -127,19 +656,152 @@ class MSMEVectorStore:
             where=where_clause if where_clause else None
         )
 
-        # Format results
+        return self._format_results(results)
+
+    def search_hybrid(self, query: str, n_results: int = 10, filter_dict: Dict = None) -> List[Dict]:
+        """Search with lexical (BM25) and vector rankings fused together"""
+        return self.search_batch(
+            [{"query": query, "filter": filter_dict, "n_results": n_results}], hybrid=True
+        )[0]
+
+    def search_batch(self, requests: List[Dict[str, Any]], hybrid: bool = False,
+                     include_embeddings: bool = False) -> List[List[Dict]]:
+        """
+        Run many searches at once. Each request is a dict with "query" and optional
+        "filter" and "n_results"; results come back in request order. With `hybrid`,
+        each vector ranking is fused with the BM25 ranking for the same query.
+        `include_embeddings` adds each hit's stored vector under "embedding".
+        """
+        if not requests:
+            return []
+        # No lexical index in http mode (see _open_state)
+        hybrid = hybrid and self.lexical_index is not None
+
+        # Embed every distinct query text exactly once
+        texts = list(dict.fromkeys(request["query"] for request in requests))
+        vectors = dict(zip(texts, self.embedding_function(texts)))
+
+        # Requests sharing a filter become a single multi-embedding query
+        groups = {}
+        for index, request in enumerate(requests):
+            where = request.get("filter") or None
+            key = json.dumps(where, sort_keys=True)
+            groups.setdefault(key, (where, []))[1].append(index)
+
+        output = [[] for _ in requests]
+
+        def run_group(where: Dict, indexes: List[int]):
+            limits = [requests[i].get("n_results", 10) for i in indexes]
+            n_results = max(limits + [config.HYBRID_CANDIDATES]) if hybrid else max(limits)
+            results = self.collection.query(
+                query_embeddings=[vectors[requests[i]["query"]] for i in indexes],
+                n_results=n_results,
+                where=where,
+                include=["documents", "metadatas", "distances"] + (["embeddings"] if include_embeddings else [])
+            )
+            for row, (index, limit) in enumerate(zip(indexes, limits)):
+                hits = self._format_results(results, row)
+                if hybrid:
+                    output[index] = self._fuse_lexical(requests[index]["query"], hits, limit, where,
+                                                       include_embeddings=include_embeddings)
+                else:
+                    output[index] = hits[:limit]
+
+        # Distinct filters are issued concurrently, so latency is one round-trip
+        if len(groups) == 1:
+            run_group(*next(iter(groups.values())))
+        else:
+            futures = [self.query_executor.submit(run_group, where, indexes)
+                       for where, indexes in groups.values()]
+            for future in futures:
+                future.result()
+
+        return output
+
+    def _fuse_lexical(self, query: str, vector_hits: List[Dict], n_results: int,
+                      where: Dict = None, include_embeddings: bool = False) -> List[Dict]:
+        """Reciprocal-rank fusion of vector hits with BM25 hits that pass the same filter"""
+        hits = {hit["id"]: hit for hit in vector_hits}
+        lexical_ids = [doc_id for doc_id, _ in self.lexical_index.search(query, k=config.HYBRID_CANDIDATES)]
+
+        # Lexical-only hits still have to satisfy the metadata filter
+        missing = [doc_id for doc_id in lexical_ids if doc_id not in hits]
+        if missing:
+            include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+            fetched = self.collection.get(ids=missing, where=where, include=include)
+            for position, doc_id in enumerate(fetched["ids"]):
+                hits[doc_id] = {"document": fetched["documents"][position],
+                                "metadata": fetched["metadatas"][position], "distance": None, "id": doc_id}
+                if include_embeddings:
+                    hits[doc_id]["embedding"] = fetched["embeddings"][position]
+        lexical_ids = [doc_id for doc_id in lexical_ids if doc_id in hits]
+
+        scores = {}
+        for ranking in ([hit["id"] for hit in vector_hits], lexical_ids):
+            for rank, doc_id in enumerate(ranking):
+                scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (config.HYBRID_RRF_K + rank + 1)
+
+        ranked = sorted(scores, key=scores.get, reverse=True)[:n_results]
+        return [dict(hits[doc_id], score=scores[doc_id]) for doc_id in ranked]
+
+    def _format_results(self, results: Dict[str, Any], row: int = 0) -> List[Dict]:
+        """Flatten one row of a Chroma query result into a list of hits"""
         formatted_results = []
-        if results["documents"] and results["documents"][0]:
-            for i in range(len(results["documents"][0])):
+        if results["documents"] and results["documents"][row]:
+            for i in range(len(results["documents"][row])):
                 formatted_results.append({
-                    "document": results["documents"][0][i],
-                    "metadata": results["metadatas"][0][i],
-                    "distance": results["distances"][0][i] if results.get("distances") else None,
-                    "id": results["ids"][0][i]
+                    "document": results["documents"][row][i],
+                    "metadata": results["metadatas"][row][i],
+                    "distance": results["distances"][row][i] if results.get("distances") else None,
+                    "id": results["ids"][row][i]
                 })
+                if results.get("embeddings"):
+                    formatted_results[-1]["embedding"] = results["embeddings"][row][i]
 
         return formatted_results
 
+    def rerank_mmr(self, query: str, hits: List[Dict], k: int = None, lambda_mult: float = None) -> List[Dict]:
+        """
+        Pick k hits by maximal marginal relevance: each step takes the hit that is most
+        relevant to the query minus its similarity to the hits already picked. Works on
+        the "embedding" of each hit (search_batch(..., include_embeddings=True)).
+        Relevance is the fused hybrid "score" when every hit has one, otherwise cosine
+        similarity to the query.
+        """
+        k = k or config.MMR_CONTEXT_DOCS
+        lambda_mult = config.MMR_LAMBDA if lambda_mult is None else lambda_mult
+        if len(hits) <= 1 or any(hit.get("embedding") is None for hit in hits):
+            return [self._without_embedding(hit) for hit in hits[:k]]
+
+        vectors = np.asarray([hit["embedding"] for hit in hits], dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        if all(hit.get("score") is not None for hit in hits):
+            # Lexical-only matches have no useful cosine similarity; their fused rank is the signal.
+            # Min-max scaling puts it on the same 0..1 footing as the redundancy term.
+            scores = np.asarray([hit["score"] for hit in hits], dtype=np.float32)
+            spread = float(scores.max() - scores.min())
+            relevance = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+        else:
+            query_vector = np.asarray(self.embedding_function([query])[0], dtype=np.float32)
+            query_vector /= max(float(np.linalg.norm(query_vector)), 1e-12)
+            relevance = vectors @ query_vector
+        pairwise = vectors @ vectors.T
+        selected = [int(np.argmax(relevance))]
+        # Highest similarity of every candidate to anything already selected
+        redundancy = pairwise[selected[0]].copy()
+        while len(selected) < min(k, len(hits)):
+            scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+            scores[selected] = -np.inf
+            best = int(np.argmax(scores))
+            selected.append(best)
+            redundancy = np.maximum(redundancy, pairwise[best])
+
+        return [self._without_embedding(hits[i]) for i in selected]
+
+    def _without_embedding(self, hit: Dict) -> Dict:
+        return {key: value for key, value in hit.items() if key != "embedding"}
+
     def search_by_sector(self, query: str, sector: str, n_results: int = 5) -> List[Dict]:
         """Search for content related to a specific sector"""
         return self.search_similar(
@@ -148,91 +810,138 @@ class MSMEVectorStore:
             filter_dict={"sector": sector}
         )
 
-    def search_companies_by_criteria(self, sector: str = None, risk_level: str = None, 
-                                   min_employees: int = None) -> List[Dict]:
-        """Search companies by specific criteria"""
-        where_clause = {"type": "company"}
-
+    def search_companies_by_criteria(self, sector: str = None, risk_level: str = None,
+                                     min_employees: int = None, sort_by: str = "employee_count",
+                                     descending: bool = True, limit: int = None) -> List[Dict]:
+        """Search companies by specific criteria, returning every match sorted by `sort_by`"""
+        equals = {}
         if sector:
-            where_clause["sector"] = sector
+            equals["sector"] = sector
         if risk_level:
-            where_clause["risk_level"] = risk_level
-        if min_employees:
-            where_clause["employee_count"] = {"$gte": min_employees}
-
-        results = self.collection.query(
-            query_texts=["company information"],
-            n_results=50,
-            where=where_clause
-        )
+            equals["risk_level"] = risk_level
 
-        return results
-
-    def get_recent_news(self, hours: int = 24, category: str = None) -> List[Dict]:
-        """Get recent news articles"""
-        where_clause = {"type": "news"}
-        if category:
-            where_clause["category"] = category
-
-        results = self.collection.query(
-            query_texts=["latest news updates"],
-            n_results=20,
-            where=where_clause
-        )
-
-        return results
-
-    def _create_company_document(self, company: pd.Series, financials: pd.DataFrame) -> str:
-        """Create a comprehensive text document for a company"""
+        minimums = {}
+        if min_employees:
+            minimums["employee_count"] = min_employees
+
+        # Vectorized predicates over the in-memory columns; no vector search involved
+        ids = self._current_company_index().select(equals=equals, minimums=minimums,
+                                        sort_by=sort_by, descending=descending, limit=limit)
+        return self._get_documents(ids)
+
+    def get_recent_news(self, hours: int = 24, category: str = None, limit: int = 20) -> List[Dict]:
+        """Get the newest news articles published in the last `hours`, newest first"""
+        # A range scan over the recency index; no embedding or vector search involved
+        since = time.time() - hours * 3600
+        ids = self._current_recency_index(since).latest(since=since, category=category, limit=limit)
+        return self._get_documents(ids)
+
+    def _get_documents(self, ids: List[str]) -> List[Dict]:
+        """Fetch documents by ID in the given order, in the same shape as search results"""
+        if not ids:
+            return []
+
+        results = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        by_id = {
+            doc_id: {"document": document, "metadata": metadata, "distance": None, "id": doc_id}
+            for doc_id, document, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+        }
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+
+    def _create_company_documents(self, companies_df: pd.DataFrame,
+                                  financial_df: pd.DataFrame) -> List[str]:
+        """Create a text document for every company, built column-wise over the whole frame"""
+        if companies_df.empty:
+            return []
+
+        def text(column: str, default: str = "N/A") -> pd.Series:
+            if column in companies_df:
+                return companies_df[column].astype(str)
+            return pd.Series(default, index=companies_df.index)
 
         # Basic company info
-        doc_parts = [
-            f"Company: {company['Company_Name']}",
-            f"Sector: {company['Sector']}",
-            f"Location: {company['Location']}",
-            f"Founded: {company['Founded_Year']}",
-            f"Employees: {company['Employee_Count']}",
-            f"Primary Products: {company['Primary_Products']}",
-            f"Certifications: {company.get('Certifications', 'N/A')}",
-            f"Export Markets: {company.get('Export_Markets', 'N/A')}",
-            f"Credit Rating: {company.get('Credit_Rating', 'N/A')}",
-            f"Risk Level: {company.get('Risk_Level', 'N/A')}",
-            f"Market Outlook: {company.get('Market_Outlook', 'N/A')}"
-        ]
-
-        # Add financial information if available
-        if not financials.empty:
-            latest_year = financials['Year'].max()
-            latest_financials = financials[financials['Year'] == latest_year].iloc[0]
-
-            doc_parts.extend([
-                f"Latest Revenue ({latest_year}): ₹{latest_financials['Revenue_Crores']:.2f} crores",
-                f"Net Profit ({latest_year}): ₹{latest_financials['Net_Profit_Crores']:.2f} crores",
-                f"Profit Margin: {latest_financials['Profit_Margin_Percent']:.2f}%",
-                f"Total Assets: ₹{latest_financials['Total_Assets_Crores']:.2f} crores",
-                f"Debt-to-Equity Ratio: {latest_financials['Debt_to_Equity_Ratio']:.2f}",
-                f"Current Ratio: {latest_financials['Current_Ratio']:.2f}",
-                f"Return on Assets: {latest_financials['ROA_Percent']:.2f}%"
-            ])
+        docs = ("Company: " + text('Company_Name') +
+                " | Sector: " + text('Sector') +
+                " | Location: " + text('Location') +
+                " | Founded: " + text('Founded_Year') +
+                " | Employees: " + text('Employee_Count') +
+                " | Primary Products: " + text('Primary_Products') +
+                " | Certifications: " + text('Certifications') +
+                " | Export Markets: " + text('Export_Markets') +
+                " | Credit Rating: " + text('Credit_Rating') +
+                " | Risk Level: " + text('Risk_Level') +
+                " | Market Outlook: " + text('Market_Outlook'))
+
+        # Group financials once: first row, latest-year row and row count per company
+        if not financial_df.empty:
+            financials = financial_df.reset_index(drop=True)
+            grouped = financials.groupby('Company_ID', sort=False)
+            first = grouped.head(1).set_index('Company_ID')
+            latest = (financials[financials['Year'] == grouped['Year'].transform('max')]
+                      .drop_duplicates('Company_ID')
+                      .set_index('Company_ID'))
+            counts = grouped.size()
+
+            company_ids = companies_df['Company_ID']
+            has_financials = company_ids.isin(latest.index).to_numpy()
+
+            def aligned(frame: pd.DataFrame, column: str) -> pd.Series:
+                return pd.Series(frame[column].reindex(company_ids).to_numpy(),
+                                 index=companies_df.index)
+
+            def money(column: str) -> pd.Series:
+                return aligned(latest, column).map(lambda v: f"{v:.2f}")
+
+            year = aligned(latest, 'Year').map(lambda v: str(int(v)) if pd.notna(v) else "")
+            fin_block = (" | Latest Revenue (" + year + "): ₹" + money('Revenue_Crores') + " crores" +
+                         " | Net Profit (" + year + "): ₹" + money('Net_Profit_Crores') + " crores" +
+                         " | Profit Margin: " + money('Profit_Margin_Percent') + "%" +
+                         " | Total Assets: ₹" + money('Total_Assets_Crores') + " crores" +
+                         " | Debt-to-Equity Ratio: " + money('Debt_to_Equity_Ratio') +
+                         " | Current Ratio: " + money('Current_Ratio') +
+                         " | Return on Assets: " + money('ROA_Percent') + "%")
 
             # Add growth trends if multiple years available
-            if len(financials) > 1:
-                revenue_growth = ((latest_financials['Revenue_Crores'] - 
-                                financials.iloc[0]['Revenue_Crores']) / 
-                                financials.iloc[0]['Revenue_Crores'] * 100)
-                doc_parts.append(f"Revenue Growth: {revenue_growth:.2f}%")
+            first_revenue = aligned(first, 'Revenue_Crores')
+            growth = (aligned(latest, 'Revenue_Crores') - first_revenue) / first_revenue * 100
+            has_growth = (pd.Series(counts.reindex(company_ids).fillna(0).to_numpy(),
+                                    index=companies_df.index) > 1).to_numpy()
+            growth_text = " | Revenue Growth: " + growth.map(lambda v: f"{v:.2f}") + "%"
+            fin_block = fin_block.where(has_financials, "")
+            fin_block = fin_block + growth_text.where(has_financials & has_growth, "")
+            docs = docs + fin_block
 
         # Add other relevant information
-        if pd.notna(company.get('Growth_Drivers')):
-            doc_parts.append(f"Growth Drivers: {company['Growth_Drivers']}")
-
-        if pd.notna(company.get('Key_Challenges')):
-            doc_parts.append(f"Key Challenges: {company['Key_Challenges']}")
-
-        if pd.notna(company.get('Digital_Maturity_Level')):
-            doc_parts.append(f"Digital Maturity: {company['Digital_Maturity_Level']}")
-
-        return " | ".join(doc_parts)
+        for column, label in [('Growth_Drivers', 'Growth Drivers'),
+                              ('Key_Challenges', 'Key Challenges'),
+                              ('Digital_Maturity_Level', 'Digital Maturity')]:
+            if column in companies_df:
+                present = companies_df[column].notna()
+                docs = docs + (f" | {label}: " + text(column)).where(present, "")
+
+        return docs.tolist()
+
+    def _create_company_metadatas(self, companies_df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Build company metadata records column-wise"""
+        def text(column: str) -> pd.Series:
+            if column in companies_df:
+                return companies_df[column].astype(str)
+            return pd.Series("N/A", index=companies_df.index)
+
+        metadata = pd.DataFrame({
+            "type": "company",
+            "company_id": companies_df['Company_ID'].astype(str),
+            "company_name": companies_df['Company_Name'].astype(str),
+            "sector": companies_df['Sector'].astype(str),
+            "location": companies_df['Location'].astype(str),
+            "founded_year": companies_df['Founded_Year'].astype(int),
+            "employee_count": companies_df['Employee_Count'].astype(int),
+            "credit_rating": text('Credit_Rating'),
+            "risk_level": text('Risk_Level'),
+            "market_outlook": text('Market_Outlook')
+        }, index=companies_df.index)
+
+        return metadata.to_dict('records')
 
     def _create_news_document(self, article: Dict[str, Any]) -> str:
         """Create a text document from news article"""
@@ -259,24 +968,17 @@ class MSMEVectorStore:
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store collection"""
         try:
-            collection_count = self.collection.count()
-
-            # Get sample of documents to analyze types
-            sample = self.collection.query(
-                query_texts=["sample"],
-                n_results=min(100, collection_count)
-            )
-
-            types_count = {}
-            if sample["metadatas"] and sample["metadatas"][0]:
-                for metadata in sample["metadatas"][0]:
-                    doc_type = metadata.get("type", "unknown")
-                    types_count[doc_type] = types_count.get(doc_type, 0) + 1
+            # Served from the incrementally maintained index, no query involved
+            index_stats = self._current_stats_index().get_stats()
 
             return {
-                "total_documents": collection_count,
-                "document_types": types_count,
-                "collection_name": config.COLLECTION_NAME
+                "total_documents": index_stats["total"],
+                "document_types": index_stats["by_type"],
+                "sectors": index_stats["by_sector"],
+                "sources": index_stats["by_source"],
+                "published_dates": index_stats["by_date"],
+                "collection_name": config.COLLECTION_NAME,
+                "embedding_cache": self.embedding_cache.get_stats()
             }
         except Exception as e:
             return {"error": str(e)}